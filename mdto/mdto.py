@@ -1,50 +1,324 @@
 import os
+import re
 import shutil
 import sys
 import subprocess
 import hashlib
+import io
+import json
+import copy
+import mmap
+import time
 from typing import TextIO, List
-from datetime import datetime
 import lxml.etree as ET
 from dataclasses import dataclass
-from functools import partial
-
-# Make into an optional dependency?
-import validators
+from functools import partial, lru_cache
 
 # globals
 MAX_NAAM_LENGTH = 80
 _force, _quiet = False, False
 
+# files up to this size are mmap'ed and hashed in one go; larger files are hashed in chunks
+_MMAP_MAX_SIZE = 256 * 1024 * 1024
+# 1 MiB fits in L2 cache, while being large enough for hashlib to release the GIL.
+# Keep this well above 256 KiB, or create_checksums() and create_bestanden()
+# will not scale across threads
+_HASH_CHUNK_SIZE = 1024 * 1024
+_BLAKE3_MULTITHREADING_MIN_SIZE = 1024 * 1024
+# from_file() reads XML files larger than this incrementally, to bound memory use
+_ITERPARSE_MIN_SIZE = 32 * 1024 * 1024
+
+# maximum total length of the paths passed to a single sf process; this stays
+# below the 32767 character limit on the length of a command line on Windows
+_SF_MAX_ARGS_LENGTH = 30_000
+
+# minimal check for the shape of an RFC 3986 URI, i.e. scheme:rest
+# (used with fullmatch(), as "$" would also match before a trailing newline)
+_URL_RE = re.compile(r"[A-Za-z][A-Za-z0-9+.\-]*:[^\s]+")
+
+# namespaces and attributes of the <MDTO> root element; shared by all to_xml() calls
+_XSI_NS = "http://www.w3.org/2001/XMLSchema-instance"
+_MDTO_NSMAP = {
+    None: "https://www.nationaalarchief.nl/mdto",  # default namespace (i.e. xmlns=https...)
+    "xsi": _XSI_NS,
+}
+_MDTO_ROOT_ATTRIB = {
+    f"{{{_XSI_NS}}}schemaLocation": "https://www.nationaalarchief.nl/mdto "
+    "https://www.nationaalarchief.nl/mdto/MDTO-XML1.0.1.xsd"
+}
+# to_xml() copies this element, which is faster than building a new one with
+# the namespaces and attributes above. Do not modify it!
+_MDTO_ROOT = ET.Element("MDTO", _MDTO_ROOT_ATTRIB, nsmap=_MDTO_NSMAP)
+
+# tags read by detect_verwijzing(), in Clark notation
+_TAG_INFORMATIEOBJECT = "{https://www.nationaalarchief.nl/mdto}informatieobject"
+_TAG_IDENTIFICATIE = "{https://www.nationaalarchief.nl/mdto}identificatie"
+_TAG_NAAM = "{https://www.nationaalarchief.nl/mdto}naam"
+_TAG_KENMERK = "{https://www.nationaalarchief.nl/mdto}identificatieKenmerk"
+_TAG_BRON = "{https://www.nationaalarchief.nl/mdto}identificatieBron"
+
 
 # Helper methods
-def _process_file(file_or_filename) -> TextIO:
-    """Return file-object if input is already a file.
-    Otherwise, assume the argument is a path, and convert
-    it to a new file-object.
+def _to_path(file_or_filename) -> str:
+    """Return the path of a file-like object, or the argument itself if it's a path."""
+    if isinstance(file_or_filename, str):
+        return file_or_filename
+    elif isinstance(file_or_filename, os.PathLike):
+        # e.g. pathlib.Path; note that these have a 'name' attribute as well
+        return os.fspath(file_or_filename)
+    elif isinstance(getattr(file_or_filename, "name", None), str):
+        return file_or_filename.name
+    else:
+        raise TypeError(
+            f"Expected file object or str, but got value of type {type(file_or_filename)}"
+        )
 
-    Note:
-        The returned file-object is always in read-only mode.
-    """
 
-    # filename?
-    if isinstance(file_or_filename, str):
-        return open(file_or_filename, "r")
-    # file-like object?
-    elif hasattr(file_or_filename, "read"):
-        # if file-like object, force it to be opened read-only
-        if file_or_filename.writable():
-            filename = file_or_filename.name
-            file_or_filename.close()
-            return open(filename, "r")
-        else:
-            return file_or_filename
+def _regular_file_path(file_or_filename) -> str | None:
+    """Return the path of the regular file behind a path or file-like object,
+    or None if the object is not backed by one (e.g. a pipe, or a member of a
+    tar archive, whose `name` is the path of the archive)."""
+    if isinstance(file_or_filename, (str, os.PathLike)):
+        return os.fspath(file_or_filename)
+
+    # text files wrap a binary stream, which in turn wraps a raw file
+    stream = getattr(file_or_filename, "buffer", file_or_filename)
+    raw = getattr(stream, "raw", stream)
+    if (
+        isinstance(raw, io.FileIO)
+        and isinstance(raw.name, str)
+        and os.path.isfile(raw.name)
+    ):
+        return raw.name
+
+    return None
+
+
+def _digest(file_or_filename, algorithm: str) -> str:
+    """Return the hexdigest of a path or file-like object.
+
+    Regular files are hashed by path (see `_hash_path()`). Other file-like
+    objects, such as pipes or members of a tar archive, are read from their
+    current position in chunks.
+    """
+    path = _regular_file_path(file_or_filename)
+    if path is not None:
+        return _hash_path(path, algorithm)
+
+    # text files cannot be hashed directly, but their underlying binary stream can
+    stream = getattr(file_or_filename, "buffer", file_or_filename)
+    if hasattr(stream, "read"):
+        h = _new_hash(algorithm)
+        _hash_stream(stream, h)
+        return h.hexdigest()
     else:
         raise TypeError(
             f"Expected file object or str, but got value of type {type(file_or_filename)}"
         )
 
 
+def _file_key(path: str, st: os.stat_result) -> tuple:
+    """Return a cache key for the file at `path`, with `st` the result of `os.stat(path)`.
+
+    Besides the size and modification time, the key contains the inode number
+    and the inode change time. Tools such as `cp -p` and `rsync -a` (or
+    `os.utime()`) can give a rewritten file its old modification time, but
+    the change time is always updated by the kernel.
+    """
+    return (
+        os.path.abspath(path),
+        st.st_size,
+        st.st_mtime_ns,
+        st.st_ino,
+        st.st_ctime_ns,
+    )
+
+
+def _hash_path(path: str, algorithm: str) -> str:
+    """Return the hexdigest of the file at `path`.
+
+    Results are cached (see `_file_key()`), so files that are hashed more than
+    once (e.g. by both create_bestand() and create_checksum()) are only read
+    once, as long as they are not modified in between.
+    """
+    return _hash_file_cached(_file_key(path, os.stat(path)), algorithm)
+
+
+@lru_cache(maxsize=4096)
+def _hash_file_cached(key: tuple, algorithm: str) -> str:
+    """Cached version of `_hash_file()`, where `key` is a `_file_key()`. Apart
+    from the path, the key's items only serve to hash modified files again."""
+    return _hash_file(key[0], algorithm)
+
+
+def _new_hash(algorithm: str, size: int = 0):
+    """Return a new hash object for `algorithm`.
+
+    Besides the algorithms supported by hashlib, this supports "blake3",
+    provided that the (optional) blake3 package is installed.
+    """
+    if algorithm != "blake3":
+        return hashlib.new(algorithm)
+
+    try:
+        import blake3
+    except ImportError:
+        _error(
+            "checksum algorithm 'blake3' requires the blake3 package. "
+            "Install it with 'pip install blake3'."
+        )
+
+    # multithreading only pays off for larger inputs
+    if size > _BLAKE3_MULTITHREADING_MIN_SIZE:
+        return blake3.blake3(max_threads=blake3.blake3.AUTO)
+    else:
+        return blake3.blake3()
+
+
+def _hash_file(path: str, algorithm: str) -> str:
+    """Return the hexdigest of the file at `path`.
+
+    Files up to `_MMAP_MAX_SIZE` bytes are memory-mapped, and then passed to
+    hashlib in a single `update()` call. This way, the whole file is hashed
+    in C (without holding the GIL), instead of in many python-sized chunks.
+    With blake3, larger files are memory-mapped as well (by blake3 itself).
+
+    The kernel is told that the file is read sequentially (for more aggressive
+    readahead), and that its pages are not needed after hashing, so hashing
+    large archives does not evict more useful data from the page cache.
+    """
+    with open(path, "rb", buffering=0) as f:
+        fd = f.fileno()
+        size = os.fstat(fd).st_size
+        h = _new_hash(algorithm, size)
+        _fadvise(fd, size, "POSIX_FADV_SEQUENTIAL")
+        if size > _MMAP_MAX_SIZE and hasattr(h, "update_mmap"):
+            # blake3 maps large files itself, and can then hash them with multiple threads;
+            # feeding it 1 MiB chunks would leave all but one thread idle
+            h.update_mmap(path)
+        # empty files cannot be mmap'ed
+        elif 0 < size <= _MMAP_MAX_SIZE:
+            try:
+                mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # some files (e.g. on certain network filesystems) cannot be mmap'ed
+                _hash_stream(f, h)
+            else:
+                with mm:
+                    # madvise() is not available on all platforms (e.g. Windows)
+                    if hasattr(mmap, "MADV_SEQUENTIAL"):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    h.update(mm)
+                    if hasattr(mmap, "MADV_DONTNEED"):
+                        mm.madvise(mmap.MADV_DONTNEED)
+        else:
+            _hash_stream(f, h)
+        _fadvise(fd, size, "POSIX_FADV_DONTNEED")
+
+    return h.hexdigest()
+
+
+def _fadvise(fd: int, size: int, advice: str) -> None:
+    """Pass `advice` (e.g. "POSIX_FADV_SEQUENTIAL") to os.posix_fadvise, where supported."""
+    # posix_fadvise does not exist on e.g. Windows and macOS
+    if size and hasattr(os, advice):
+        try:
+            os.posix_fadvise(fd, 0, size, getattr(os, advice))
+        except OSError:
+            # advice is only a hint; some filesystems do not support it
+            pass
+
+
+def _hash_stream(stream, h) -> None:
+    """Feed binary file-like `stream` into hash object `h`, in chunks of `_HASH_CHUNK_SIZE` bytes.
+
+    The chunks are read into a single, reused buffer, so no new bytes
+    objects are allocated for each chunk.
+    """
+    buf = bytearray(_HASH_CHUNK_SIZE)
+    view = memoryview(buf)
+
+    if hasattr(stream, "readinto"):
+        while n := stream.readinto(buf):
+            h.update(view[:n])
+    else:
+        while chunk := stream.read(_HASH_CHUNK_SIZE):
+            h.update(chunk)
+
+
+def _parse_xml(source) -> ET._ElementTree:
+    """Parse an XML file with lxml, without keeping whitespace-only text nodes.
+
+    MDTO files are usually indented, so this saves lxml from creating a
+    (useless) string for the indentation after nearly every element.
+    """
+    # lxml parsers must not be shared between threads, so create a new one per call
+    parser = ET.XMLParser(remove_blank_text=True)
+    return ET.parse(source, parser)
+
+
+def _aslist(value) -> list:
+    """Return `value` if it is a list, and otherwise wrap it in one.
+
+    Used for MDTO elements that may occur more than once, which can be set to
+    either a single object or a list thereof. None becomes an empty list.
+    Unlike reassigning the attribute, this does not modify the object.
+    """
+    if isinstance(value, list):
+        return value
+    return [] if value is None else [value]
+
+
+def _new_element(tag: str, parent: ET.Element = None) -> ET.Element:
+    """Return a new XML element named `tag`, as the last child of `parent` if given.
+
+    lxml has to move elements between documents when they are appended to
+    another tree, so subtrees are cheaper to build directly inside their parent.
+    """
+    if parent is None:
+        return ET.Element(tag)
+    return ET.SubElement(parent, tag)
+
+
+def _leaf(tag: str, text: str) -> ET.Element:
+    """Return a new XML element named `tag` with text `text`."""
+    elem = ET.Element(tag)
+    elem.text = text
+    return elem
+
+
+def _write_mdto_xml(file, object_tag: str, children, pretty_print: bool = True) -> None:
+    """Incrementally write an MDTO XML document to `file`.
+
+    The document contains a single <`object_tag`> element (i.e. informatieobject or bestand),
+    whose children are written one at a time as they are produced by `children`.
+    The output matches that of `to_xml()`, including its indentation.
+    """
+    # lxml writes bytes; for text streams (e.g. sys.stdout), write to the
+    # underlying binary buffer instead of encoding everything a second time
+    if isinstance(file, io.TextIOBase) and hasattr(file, "buffer"):
+        file.flush()
+        file = file.buffer
+
+    with ET.xmlfile(file, encoding="UTF-8") as xf:
+        xf.write_declaration()
+        with xf.element("MDTO", _MDTO_ROOT_ATTRIB, nsmap=_MDTO_NSMAP):
+            if not pretty_print:
+                with xf.element(object_tag):
+                    for child in children:
+                        xf.write(child)
+                return
+
+            xf.write("\n    ")
+            with xf.element(object_tag):
+                for child in children:
+                    # indent child as if it were two levels deep in the tree
+                    ET.indent(child, space="    ", level=2)
+                    xf.write("\n        ", child)
+                xf.write("\n    ")
+            xf.write("\n")
+
+
 def _log(m):
     if _quiet:
         return
@@ -76,7 +350,29 @@ def _error(error):
     sys.exit(-1)
 
 
-@dataclass
+def _url_property(slot) -> property:
+    """Return a property that warns about malformed URLs, and stores its value in `slot`.
+
+    A slotted dataclass cannot define a property with the name of one of its
+    fields, so such properties are attached after the class is created, and
+    wrap the descriptor of the field's slot.
+
+    Args:
+        slot: the slot descriptor of the field, e.g. `Bestand.URLBestand`
+    """
+
+    def setter(self, url: str | List[str]):
+        urls = url if isinstance(url, list) else [url]
+        if url is not None and not all(
+            isinstance(u, str) and _URL_RE.fullmatch(u) for u in urls
+        ):
+            _warn(f"URL '{url}' is malformed.")
+        slot.__set__(self, url)
+
+    return property(slot.__get__, setter)
+
+
+@dataclass(slots=True)
 class IdentificatieGegevens:
     """https://www.nationaalarchief.nl/archiveren/mdto/identificatieGegevens
 
@@ -88,28 +384,31 @@ class IdentificatieGegevens:
     identificatieKenmerk: str
     identificatieBron: str
 
-    def to_xml(self, root: str) -> ET.Element:
+    def to_xml(self, root: str, parent: ET.Element = None) -> ET.Element:
         """Transform IdentificatieGegevens into XML tree.
 
         Args:
             root (str): name of the new root tag
+            parent (ET.Element, optional): element to add the new element to
 
         Returns:
             ET.Element: XML representation of IdentificatieGegevens with new root tag
         """
 
-        root = ET.Element(root)
+        # bind locally, to avoid looking up ET.SubElement for every child
+        SubElement = ET.SubElement
+        root = _new_element(root, parent)
 
-        kenmerk = ET.SubElement(root, "identificatieKenmerk")
+        kenmerk = SubElement(root, "identificatieKenmerk")
         kenmerk.text = self.identificatieKenmerk
 
-        bron = ET.SubElement(root, "identificatieBron")
+        bron = SubElement(root, "identificatieBron")
         bron.text = self.identificatieBron
 
         return root
 
 
-@dataclass
+@dataclass(slots=True)
 class VerwijzingGegevens:
     """https://www.nationaalarchief.nl/archiveren/mdto/verwijzingsGegevens
 
@@ -139,30 +438,30 @@ class VerwijzingGegevens:
     #               f"exceeds maximum length of {MAX_NAAM_LENGTH}.")
     #     self._verwijzingNaam = val
 
-    def to_xml(self, root: str) -> ET.Element:
+    def to_xml(self, root: str, parent: ET.Element = None) -> ET.Element:
         """Transform VerwijzingGegevens into XML tree.
 
         Args:
             root (str): name of the new root tag
+            parent (ET.Element, optional): element to add the new element to
 
         Returns:
             ET.Element: XML representation of VerwijzingGegevens with new root tag
         """
 
-        root = ET.Element(root)
+        root = _new_element(root, parent)
 
         verwijzingnaam = ET.SubElement(root, "verwijzingNaam")
         verwijzingnaam.text = self.verwijzingNaam
 
         if self.verwijzingIdentificatie:
-            # append lxml element directly to tree,
-            # and set name of the root element to 'verwijzingIdentificatie'
-            root.append(self.verwijzingIdentificatie.to_xml("verwijzingIdentificatie"))
+            # build <verwijzingIdentificatie> directly inside root
+            self.verwijzingIdentificatie.to_xml("verwijzingIdentificatie", root)
 
         return root
 
 
-@dataclass
+@dataclass(slots=True)
 class BegripGegevens:
     """https://www.nationaalarchief.nl/archiveren/mdto/begripGegevens
 
@@ -176,31 +475,33 @@ class BegripGegevens:
     begripBegrippenlijst: VerwijzingGegevens
     begripCode: str = None
 
-    def to_xml(self, root: str) -> ET.Element:
+    def to_xml(self, root: str, parent: ET.Element = None) -> ET.Element:
         """Transform BegripGegevens into XML tree.
 
         Args:
             root (str): name of the new root tag
+            parent (ET.Element, optional): element to add the new element to
 
         Returns:
             ET.Element: XML representation of BegripGegevens with new root tag
         """
 
-        root = ET.Element(root)
+        SubElement = ET.SubElement
+        root = _new_element(root, parent)
 
-        begriplabel = ET.SubElement(root, "begripLabel")
+        begriplabel = SubElement(root, "begripLabel")
         begriplabel.text = self.begripLabel
 
         if self.begripCode:
-            begripcode = ET.SubElement(root, "begripCode")
+            begripcode = SubElement(root, "begripCode")
             begripcode.text = self.begripCode
 
-        root.append(self.begripBegrippenlijst.to_xml("begripBegrippenlijst"))
+        self.begripBegrippenlijst.to_xml("begripBegrippenlijst", root)
 
         return root
 
 
-@dataclass
+@dataclass(slots=True)
 class TermijnGegevens:
     """https://www.nationaalarchief.nl/archiveren/mdto/termijnGegevens
 
@@ -216,37 +517,37 @@ class TermijnGegevens:
     termijnLooptijd: str = None
     termijnEinddatum: str = None
 
-    def to_xml(self, root: str) -> ET.Element:
+    def to_xml(self, root: str, parent: ET.Element = None) -> ET.Element:
         """Transform TermijnGegevens into XML tree.
 
         Args:
             root (str): name of the new root tag
+            parent (ET.Element, optional): element to add the new element to
 
         Returns:
             ET.Element: XML representation of TermijnGegevens with new root tag
         """
-        root = ET.Element(root)
+        SubElement = ET.SubElement
+        root = _new_element(root, parent)
 
         if self.termijnTriggerStartLooptijd:
-            root.append(
-                self.termijnTriggerStartLooptijd.to_xml("termijnTriggerStartLooptijd")
-            )
+            self.termijnTriggerStartLooptijd.to_xml("termijnTriggerStartLooptijd", root)
 
         if self.termijnStartdatumLooptijd:
-            termijnStartdatumLooptijd = ET.SubElement(root, "termijnStartdatumLooptijd")
+            termijnStartdatumLooptijd = SubElement(root, "termijnStartdatumLooptijd")
             termijnStartdatumLooptijd.text = self.termijnStartdatumLooptijd
 
         if self.termijnLooptijd:
-            termijnLooptijd = ET.SubElement(root, "termijnLooptijd")
+            termijnLooptijd = SubElement(root, "termijnLooptijd")
             termijnLooptijd.text = self.termijnLooptijd
 
         if self.termijnEinddatum:
-            termijnEinddatum = ET.SubElement(root, "termijnEinddatum")
+            termijnEinddatum = SubElement(root, "termijnEinddatum")
             termijnEinddatum.text = self.termijnEinddatum
 
         return root
 
-@dataclass
+@dataclass(slots=True)
 class ChecksumGegevens:
     """https://www.nationaalarchief.nl/archiveren/mdto/checksum
 
@@ -258,7 +559,7 @@ class ChecksumGegevens:
     checksumWaarde: str
     checksumDatum: str
 
-    def to_xml(self) -> ET.Element:
+    def to_xml(self, parent: ET.Element = None) -> ET.Element:
         """Transform ChecksumGegevens into XML tree with the following structure:
 
          ```xml
@@ -272,24 +573,28 @@ class ChecksumGegevens:
 
          ```
 
+        Args:
+            parent (ET.Element, optional): element to add the new element to
+
         Returns:
              ET.Element: XML representation of object
         """
 
-        root = ET.Element("checksum")
+        SubElement = ET.SubElement
+        root = _new_element("checksum", parent)
 
-        root.append(self.checksumAlgoritme.to_xml("checksumAlgoritme"))
+        self.checksumAlgoritme.to_xml("checksumAlgoritme", root)
 
-        checksumWaarde = ET.SubElement(root, "checksumWaarde")
+        checksumWaarde = SubElement(root, "checksumWaarde")
         checksumWaarde.text = self.checksumWaarde
 
-        checksumDatum = ET.SubElement(root, "checksumDatum")
+        checksumDatum = SubElement(root, "checksumDatum")
         checksumDatum.text = self.checksumDatum
 
         return root
 
 
-@dataclass
+@dataclass(slots=True)
 class BeperkingGebruikGegevens:
     """https://www.nationaalarchief.nl/archiveren/mdto/beperkingGebruik
 
@@ -307,16 +612,19 @@ class BeperkingGebruikGegevens:
     beperkingGebruikDocumentatie: VerwijzingGegevens = None
     beperkingGebruikTermijn: TermijnGegevens = None
 
-    def to_xml(self) -> ET.Element:
+    def to_xml(self, parent: ET.Element = None) -> ET.Element:
         """Transform BeperkingGebruikGegevens into XML tree.
 
+        Args:
+            parent (ET.Element, optional): element to add the new element to
+
         Returns:
             ET.Element: XML representation of BeperkingGebruikGegevens
         """
 
-        root = ET.Element("beperkingGebruik")
+        root = _new_element("beperkingGebruik", parent)
 
-        root.append(self.beperkingGebruikType.to_xml("beperkingGebruikType"))
+        self.beperkingGebruikType.to_xml("beperkingGebruikType", root)
 
         if self.beperkingGebruikNadereBeschrijving:
             nadereBeschrijving = ET.SubElement(
@@ -325,17 +633,17 @@ class BeperkingGebruikGegevens:
             nadereBeschrijving.text = self.beperkingGebruikNadereBeschrijving
 
         if self.beperkingGebruikDocumentatie:
-            root.append(
-                self.beperkingGebruikDocumentatie.to_xml("beperkingGebruikDocumentatie")
+            self.beperkingGebruikDocumentatie.to_xml(
+                "beperkingGebruikDocumentatie", root
             )
 
         if self.beperkingGebruikTermijn:
-            root.append(self.beperkingGebruikTermijn.to_xml("beperkingGebruikTermijn"))
+            self.beperkingGebruikTermijn.to_xml("beperkingGebruikTermijn", root)
 
         return root
 
 
-@dataclass
+@dataclass(slots=True)
 class DekkingInTijdGegevens:
     """https://www.nationaalarchief.nl/archiveren/mdto/dekkingInTijd
 
@@ -349,22 +657,23 @@ class DekkingInTijdGegevens:
     dekkingInTijdBegindatum: str
     dekkingInTijdEinddatum: str = None
 
-    def to_xml(self) -> ET.Element:
-        root = ET.Element("dekkingInTijd")
+    def to_xml(self, parent: ET.Element = None) -> ET.Element:
+        SubElement = ET.SubElement
+        root = _new_element("dekkingInTijd", parent)
 
-        root.append(self.dekkingInTijdType.to_xml("dekkingInTijdType"))
+        self.dekkingInTijdType.to_xml("dekkingInTijdType", root)
 
-        begin_datum_elem = ET.SubElement(root, "dekkingInTijdBegindatum")
+        begin_datum_elem = SubElement(root, "dekkingInTijdBegindatum")
         begin_datum_elem.text = self.dekkingInTijdBegindatum
 
         if self.dekkingInTijdEinddatum:
-            eind_datum_elem = ET.SubElement(root, "dekkingInTijdEinddatum")
+            eind_datum_elem = SubElement(root, "dekkingInTijdEinddatum")
             eind_datum_elem.text = self.dekkingInTijdEinddatum
 
         return root
 
 
-@dataclass
+@dataclass(slots=True)
 class EventGegevens:
     """https://www.nationaalarchief.nl/archiveren/mdto/event
 
@@ -380,28 +689,27 @@ class EventGegevens:
     eventVerantwoordelijkeActor: VerwijzingGegevens = None
     eventResultaat: str = None
 
-    def to_xml(self) -> ET.Element:
-        root = ET.Element("event")
+    def to_xml(self, parent: ET.Element = None) -> ET.Element:
+        SubElement = ET.SubElement
+        root = _new_element("event", parent)
 
-        root.append(self.eventType.to_xml("eventType"))
+        self.eventType.to_xml("eventType", root)
 
         if self.eventTijd:
-            event_tijd_elem = ET.SubElement(root, "eventTijd")
+            event_tijd_elem = SubElement(root, "eventTijd")
             event_tijd_elem.text = self.eventTijd
 
         if self.eventVerantwoordelijkeActor:
-            root.append(
-                self.eventVerantwoordelijkeActor.to_xml("eventVerantwoordelijkeActor")
-            )
+            self.eventVerantwoordelijkeActor.to_xml("eventVerantwoordelijkeActor", root)
 
         if self.eventResultaat:
-            event_resultaat_elem = ET.SubElement(root, "eventResultaat")
+            event_resultaat_elem = SubElement(root, "eventResultaat")
             event_resultaat_elem.text = self.eventResultaat
 
         return root
 
 
-@dataclass
+@dataclass(slots=True)
 class RaadpleeglocatieGegevens:
     """https://www.nationaalarchief.nl/archiveren/mdto/raadpleeglocatie
 
@@ -413,12 +721,12 @@ class RaadpleeglocatieGegevens:
     raadpleeglocatieFysiek: VerwijzingGegevens = None
     raadpleeglocatieOnline: str = None
 
-    def to_xml(self):
-        root = ET.Element("raadpleeglocatie")
+    def to_xml(self, parent: ET.Element = None) -> ET.Element:
+        root = _new_element("raadpleeglocatie", parent)
 
         # raadpleeglocatie may have no children, strangely enough
         if self.raadpleeglocatieFysiek:
-            root.append(self.raadpleeglocatieFysiek.to_xml("raadpleeglocatieFysiek"))
+            self.raadpleeglocatieFysiek.to_xml("raadpleeglocatieFysiek", root)
 
         if self.raadpleeglocatieOnline:
             raadpleeglocatie_online_elem = ET.SubElement(root, "raadpleeglocatieOnline")
@@ -426,31 +734,14 @@ class RaadpleeglocatieGegevens:
 
         return root
 
-    @property
-    def raadpleeglocatieOnline(self):
-        return self._raadpleeglocatieOnline
-
-    @raadpleeglocatieOnline.setter
-    def raadpleeglocatieOnline(self, url: str | List[str]):
-        """https://www.nationaalarchief.nl/archiveren/mdto/raadpleeglocatieOnline
 
-        Args:
-            url (str): any RFC 3986 compliant URI
-        """
-        # if url is not set, (e.g. when calling RaadpleegLocatieGegevens() without arguments)
-        # it will not be None, but rather an empty "property" object
-        if isinstance(url, property) or url is None:  # check if empty
-            self._raadpleeglocatieOnline = None
-        elif isinstance(url, list) and all(validators.url(u) for u in url):
-            self._raadpleeglocatieOnline = url
-        elif isinstance(url, str) and validators.url(url):
-            self._raadpleeglocatieOnline = url
-        else:
-            _warn(f"URL '{url}' is malformed.")
-            self._raadpleeglocatieOnline = url
+# https://www.nationaalarchief.nl/archiveren/mdto/raadpleeglocatieOnline
+RaadpleeglocatieGegevens.raadpleeglocatieOnline = _url_property(
+    RaadpleeglocatieGegevens.raadpleeglocatieOnline
+)
 
 
-@dataclass
+@dataclass(slots=True)
 class GerelateerdInformatieobjectGegevens:
     """https://www.nationaalarchief.nl/archiveren/mdto/gerelateerdInformatieobjectGegevens
 
@@ -462,25 +753,21 @@ class GerelateerdInformatieobjectGegevens:
     gerelateerdInformatieobjectVerwijzing: VerwijzingGegevens
     gerelateerdInformatieobjectTypeRelatie: BegripGegevens
 
-    def to_xml(self) -> ET.Element:
-        root = ET.Element("gerelateerdInformatieobject")
+    def to_xml(self, parent: ET.Element = None) -> ET.Element:
+        root = _new_element("gerelateerdInformatieobject", parent)
 
-        root.append(
-            self.gerelateerdInformatieobjectVerwijzing.to_xml(
-                "gerelateerdInformatieobjectVerwijzing"
-            )
+        self.gerelateerdInformatieobjectVerwijzing.to_xml(
+            "gerelateerdInformatieobjectVerwijzing", root
         )
 
-        root.append(
-            self.gerelateerdInformatieobjectTypeRelatie.to_xml(
-                "gerelateerdInformatieobjectTypeRelatie"
-            )
+        self.gerelateerdInformatieobjectTypeRelatie.to_xml(
+            "gerelateerdInformatieobjectTypeRelatie", root
         )
 
         return root
 
 
-@dataclass
+@dataclass(slots=True)
 class BetrokkeneGegevens:
     """https://www.nationaalarchief.nl/archiveren/mdto/betrokkeneGegevens
 
@@ -492,18 +779,18 @@ class BetrokkeneGegevens:
     betrokkeneTypeRelatie: BegripGegevens
     betrokkeneActor: VerwijzingGegevens
 
-    def to_xml(self) -> ET.Element:
-        root = ET.Element("betrokkene")
+    def to_xml(self, parent: ET.Element = None) -> ET.Element:
+        root = _new_element("betrokkene", parent)
 
-        root.append(self.betrokkeneTypeRelatie.to_xml("betrokkeneTypeRelatie"))
-        root.append(self.betrokkeneActor.to_xml("betrokkeneActor"))
+        self.betrokkeneTypeRelatie.to_xml("betrokkeneTypeRelatie", root)
+        self.betrokkeneActor.to_xml("betrokkeneActor", root)
 
         return root
 
 
 # TODO: this should be a subclass of a general object class
 # TODO: place more restrictions on taal?
-@dataclass
+@dataclass(slots=True)
 class Informatieobject:
     """https://www.nationaalarchief.nl/archiveren/mdto/informatieobject
 
@@ -513,8 +800,7 @@ class Informatieobject:
     informatieobject = Informatieobject(IdentificatieGegevens(…), naam="Kapvergunning", …)
 
     xml = informatieobject.to_xml()
-    with open("informatieobject.xml", 'w') as output_file:
-        xml.write(output_file, xml_declaration=True, short_empty_elements=False)
+    xml.write("informatieobject.xml", xml_declaration=True, encoding="UTF-8")
     ```
 
     Args:
@@ -566,7 +852,7 @@ class Informatieobject:
     betrokkene: BetrokkeneGegevens | List[BetrokkeneGegevens] = None
     activiteit: VerwijzingGegevens = None
 
-    def to_xml(self) -> ET.ElementTree:
+    def to_xml(self, pretty_print: bool = True) -> ET.ElementTree:
         """Transform Informatieobject into an XML tree with the following structure:
 
         ```xml
@@ -577,138 +863,121 @@ class Informatieobject:
         </MDTO>
         ```
 
+        Args:
+            pretty_print (bool, optional): indent the XML tree. Indenting is
+              not needed for the XML to be valid; pass False to skip it
+              when the output is only read by other programs.
+
         Returns:
             ET.ElementTree: XML tree representing the Informatieobject object.
         """
 
-        # construct attributes of <MDTO>
-        xsi_ns = "http://www.w3.org/2001/XMLSchema-instance"
-        nsmap = {
-            None: "https://www.nationaalarchief.nl/mdto",  # default namespace (i.e. xmlns=https...)
-            "xsi": xsi_ns,
-        }
-
         # create <MDTO>
-        mdto = ET.Element("MDTO", nsmap=nsmap)
-
-        # set schemaLocation attribute of <MDTO>
-        mdto.set(
-            f"{{{xsi_ns}}}schemaLocation",
-            "https://www.nationaalarchief.nl/mdto https://www.nationaalarchief.nl/mdto/MDTO-XML1.0.1.xsd",
-        )
+        mdto = copy.copy(_MDTO_ROOT)
 
         root = ET.SubElement(mdto, "informatieobject")
+        root.extend(self._iter_children())
+
+        # formatting preferences should perhaps be handled by e.g. xmllint
+        tree = ET.ElementTree(mdto)
+        if pretty_print:
+            ET.indent(tree, space="    ")  # use 4 spaces as indentation
+
+        return tree
 
-        # allow users to pass either a single IdentificatieGegevens object, or a list thereof
-        if isinstance(self.identificatie, IdentificatieGegevens):
-            self.identificatie = [self.identificatie]
+    def write_xml(self, file, pretty_print: bool = True) -> None:
+        """Write Informatieobject as MDTO XML to `file`.
 
-        for i in self.identificatie:
-            root.append(i.to_xml("identificatie"))
+        Unlike `to_xml()`, this does not build the whole XML tree in memory
+        first; each child of <informatieobject> is written as soon as it is built.
+        The output is identical to writing the tree returned by `to_xml()`.
 
-        naam_elem = ET.SubElement(root, "naam")
-        naam_elem.text = self.naam
+        Example:
+
+        ```python
+        with open("informatieobject.xml", 'wb') as output_file:
+            informatieobject.write_xml(output_file)
+        ```
+
+        Args:
+            file: path or file-like object (e.g. `sys.stdout`) to write to
+            pretty_print (bool, optional): indent the XML, like `to_xml()`
+        """
+        _write_mdto_xml(file, "informatieobject", self._iter_children(), pretty_print)
+
+    def _iter_children(self):
+        """Yield the children of <informatieobject> as XML elements, in MDTO order."""
+
+        # repeatable elements may be either a single object, or a list thereof
+        for i in _aslist(self.identificatie):
+            yield i.to_xml("identificatie")
+
+        yield _leaf("naam", self.naam)
 
         if self.aggregatieniveau:
-            root.append(self.aggregatieniveau.to_xml("aggregatieniveau"))
+            yield self.aggregatieniveau.to_xml("aggregatieniveau")
 
         if self.classificatie:
-            root.append(self.classificatie.to_xml("classificatie"))
-
-        if self.trefwoord:
-            # allow users to pass either a single trefwoord, or a list thereof
-            if isinstance(self.trefwoord, str):
-                self.trefwoord = [self.trefwoord]
+            yield self.classificatie.to_xml("classificatie")
 
-            for t in self.trefwoord:
-                trefwoord = ET.SubElement(root, "trefwoord")
-                trefwoord.text = t
+        for t in _aslist(self.trefwoord):
+            yield _leaf("trefwoord", t)
 
         if self.omschrijving:
-            omschrijving_elem = ET.SubElement(root, "omschrijving")
-            omschrijving_elem.text = self.omschrijving
+            yield _leaf("omschrijving", self.omschrijving)
 
         if self.raadpleeglocatie:
-            root.append(self.raadpleeglocatie.to_xml())
+            yield self.raadpleeglocatie.to_xml()
 
         if self.dekkingInTijd:
-            root.append(self.dekkingInTijd.to_xml())
+            yield self.dekkingInTijd.to_xml()
 
         if self.dekkingInRuimte:
-            root.append(self.dekkingInRuimte.to_xml("dekkingInRuimte"))
+            yield self.dekkingInRuimte.to_xml("dekkingInRuimte")
 
         if self.taal:
-            taal_elem = ET.SubElement(root, "taal")
-            taal_elem.text = self.taal
-
-        if self.event:
-            if isinstance(self.event, EventGegevens):
-                self.event = [self.event]
+            yield _leaf("taal", self.taal)
 
-            for e in self.event:
-                root.append(e.to_xml())
+        for e in _aslist(self.event):
+            yield e.to_xml()
 
-        root.append(self.waardering.to_xml("waardering"))
+        yield self.waardering.to_xml("waardering")
 
         if self.bewaartermijn:
-            root.append(self.bewaartermijn.to_xml("bewaartermijn"))
+            yield self.bewaartermijn.to_xml("bewaartermijn")
 
         if self.informatiecategorie:
-            root.append(self.informatiecategorie.to_xml("informatiecategorie"))
+            yield self.informatiecategorie.to_xml("informatiecategorie")
 
         if self.isOnderdeelVan:
-            root.append(self.isOnderdeelVan.to_xml("isOnderdeelVan"))
+            yield self.isOnderdeelVan.to_xml("isOnderdeelVan")
 
-        if self.bevatOnderdeel:
-            if isinstance(self.bevatOnderdeel, VerwijzingGegevens):
-                self.bevatOnderdeel = [self.bevatOnderdeel]
-
-            for b in self.bevatOnderdeel:
-                root.append(b.to_xml("bevatOnderdeel"))
+        for b in _aslist(self.bevatOnderdeel):
+            yield b.to_xml("bevatOnderdeel")
 
         if self.heeftRepresentatie:
-            root.append(self.heeftRepresentatie.to_xml("heeftRepresentatie"))
+            yield self.heeftRepresentatie.to_xml("heeftRepresentatie")
 
-        if self.aanvullendeMetagegevens:
-            if isinstance(self.aanvullendeMetagegevens, VerwijzingGegevens):
-                self.aanvullendeMetagegevens = [self.aanvullendeMetagegevens]
-            for b in self.aanvullendeMetagegevens:
-                root.append(b.to_xml("aanvullendeMetagegevens"))
+        for a in _aslist(self.aanvullendeMetagegevens):
+            yield a.to_xml("aanvullendeMetagegevens")
 
         if self.gerelateerdInformatieobject:
-            root.append(
-                self.gerelateerdInformatieobject.to_xml("gerelateerdInformatieobject")
-            )
-
-        root.append(self.archiefvormer.to_xml("archiefvormer"))
+            yield self.gerelateerdInformatieobject.to_xml()
 
-        if self.betrokkene:
-            # allow users to pass either a single BetrokkeneGegevens object, or a list thereof
-            if isinstance(self.betrokkene, BetrokkeneGegevens):
-                self.betrokkene = [self.betrokkene]
+        for a in _aslist(self.archiefvormer):
+            yield a.to_xml("archiefvormer")
 
-            for b in self.betrokkene:
-                root.append(b.to_xml())
+        for b in _aslist(self.betrokkene):
+            yield b.to_xml()
 
         if self.activiteit:
-            root.append(self.activiteit.to_xml("activiteit"))
+            yield self.activiteit.to_xml("activiteit")
 
-        # allow users to pass either a single BeperkingGebruikGegevens object, or a list thereof
-        if isinstance(self.beperkingGebruik, BeperkingGebruikGegevens):
-            self.beperkingGebruik = [self.beperkingGebruik]
+        for b in _aslist(self.beperkingGebruik):
+            yield b.to_xml()
 
-        for b in self.beperkingGebruik:
-            root.append(b.to_xml())
-
-        # can you abstract this? this is now double
-        # on the other hand, formatting preferences should be handled by e.g. xmllint
-        tree = ET.ElementTree(mdto)
-        ET.indent(tree, space="    ")  # use 4 spaces as indentation
 
-        return tree
-
-
-@dataclass
+@dataclass(slots=True)
 class Bestand:
     """https://www.nationaalarchief.nl/archiveren/mdto/bestand
 
@@ -743,7 +1012,7 @@ class Bestand:
                 f"exceeds maximum length of {MAX_NAAM_LENGTH}."
             )
 
-    def to_xml(self) -> ET.ElementTree:
+    def to_xml(self, pretty_print: bool = True) -> ET.ElementTree:
         """
         Transform Bestand into an XML tree with the following structure:
 
@@ -755,84 +1024,91 @@ class Bestand:
         </MDTO>
         ```
 
+        Args:
+            pretty_print (bool, optional): indent the XML tree
+
         Returns:
             ET.ElementTree: XML tree representing Bestand object. This object can be written to a file by calling `.write()`.
         """
 
-        # construct attributes of <MDTO>
-        xsi_ns = "http://www.w3.org/2001/XMLSchema-instance"
-        nsmap = {
-            None: "https://www.nationaalarchief.nl/mdto",  # default namespace (i.e. xmlns=https...)
-            "xsi": xsi_ns,
-        }
-
         # create <MDTO>
-        mdto = ET.Element("MDTO", nsmap=nsmap)
+        mdto = copy.copy(_MDTO_ROOT)
 
-        # set schemaLocation attribute of <MDTO>
-        mdto.set(
-            f"{{{xsi_ns}}}schemaLocation",
-            "https://www.nationaalarchief.nl/mdto https://www.nationaalarchief.nl/mdto/MDTO-XML1.0.1.xsd",
-        )
+        root = ET.SubElement(mdto, "bestand")
+        root.extend(self._iter_children())
 
+        tree = ET.ElementTree(mdto)
+        if pretty_print:
+            ET.indent(tree, space="    ")  # use 4 spaces as indentation
 
-        root = ET.SubElement(mdto, "bestand")
+        return tree
+
+    def write_xml(self, file, pretty_print: bool = True) -> None:
+        """Write Bestand as MDTO XML to `file`.
+
+        Unlike `to_xml()`, this does not build the whole XML tree in memory
+        first. The output is identical to writing the tree returned by `to_xml()`.
 
-        if isinstance(self.identificatie, IdentificatieGegevens):
-            self.identificatie = [self.identificatie]
+        Args:
+            file: path or file-like object (e.g. `sys.stdout`) to write to
+            pretty_print (bool, optional): indent the XML, like `to_xml()`
+        """
+        _write_mdto_xml(file, "bestand", self._iter_children(), pretty_print)
 
-        for i in self.identificatie:
-            root.append(i.to_xml("identificatie"))
+    def _iter_children(self):
+        """Yield the children of <bestand> as XML elements, in MDTO order."""
+        for i in _aslist(self.identificatie):
+            yield i.to_xml("identificatie")
 
-        naam = ET.SubElement(root, "naam")
-        naam.text = self.naam
+        yield _leaf("naam", self.naam)
 
-        omvang = ET.SubElement(root, "omvang")
         # ET wants str types
-        omvang.text = str(self.omvang)
+        yield _leaf("omvang", str(self.omvang))
 
         # bestandsformaat can be None if fido detection failed and force is True
         if self.bestandsformaat:
-            root.append(self.bestandsformaat.to_xml("bestandsformaat"))
+            yield self.bestandsformaat.to_xml("bestandsformaat")
 
-        root.append(self.checksum.to_xml())
+        for c in _aslist(self.checksum):
+            yield c.to_xml()
 
         if self.URLBestand:
-            url = ET.SubElement(root, "URLBestand")
-            url.text = self.URLBestand
+            yield _leaf("URLBestand", self.URLBestand)
 
         # can be None if XML parsing failed
         if self.isRepresentatieVan:
-            root.append(self.isRepresentatieVan.to_xml("isRepresentatieVan"))
-
-        tree = ET.ElementTree(mdto)
-        ET.indent(tree, space="    ")  # use 4 spaces as indentation
-
-        return tree
-
-    @property
-    def URLBestand(self):
-        return self._URLBestand
-
-    @URLBestand.setter
-    def URLBestand(self, url: str):
-        """https://www.nationaalarchief.nl/archiveren/mdto/URLBestand
-
-        Args:
-            url (str): any RFC 3986 compliant URI
-        """
-        # if url is not set (e.g. when calling Bestand() without the URLBestand argument),
-        # it will not be None, but rather an empty "property" object
-        if isinstance(url, property) or url is None:  # check if empty
-            self._URLBestand = None
-        elif validators.url(url):
-            self._URLBestand = url
-        else:
-            _warn(f"URL '{url} is malformed.")
-            self._URLBestand = url
-
-
-def detect_verwijzing(informatieobject: TextIO) -> VerwijzingGegevens:
+            yield self.isRepresentatieVan.to_xml("isRepresentatieVan")
+
+
+# https://www.nationaalarchief.nl/archiveren/mdto/URLBestand
+Bestand.URLBestand = _url_property(Bestand.URLBestand)
+
+
+# Names of the begrippenlijsten used by pronominfo() and create_checksum()
+_PRONOM_BEGRIPPENLIJST = "PRONOM-register"
+_CHECKSUM_ALGORITME_BEGRIPPENLIJST = "Begrippenlijst ChecksumAlgoritme MDTO"
+
+# <begripLabel> of common hashlib algorithms; others are derived from their name
+_CHECKSUM_ALGORITME_LABELS = {
+    "md5": "MD5",
+    "sha1": "SHA-1",
+    "sha224": "SHA-224",
+    "sha256": "SHA-256",
+    "sha384": "SHA-384",
+    "sha512": "SHA-512",
+    "sha3_224": "SHA3-224",
+    "sha3_256": "SHA3-256",
+    "sha3_384": "SHA3-384",
+    "sha3_512": "SHA3-512",
+    "blake2b": "BLAKE2b",
+    "blake2s": "BLAKE2s",
+    "blake3": "BLAKE3",
+}
+
+
+def detect_verwijzing(
+    informatieobject: TextIO | str | ET.Element | ET._ElementTree,
+) -> VerwijzingGegevens:
     """A Bestand object must contain a reference to a corresponding informatieobject.
     Specifically, it expects an <isRepresentatieVan> tag with the following children:
 
@@ -841,42 +1117,161 @@ def detect_verwijzing(informatieobject: TextIO) -> VerwijzingGegevens:
     informatieobject's ID and source thereof
 
     This function infers these so-called 'VerwijzingGegevens' by
-    parsing the XML of the file `informatieobject`.
+    parsing the XML of the file `informatieobject`. An already parsed
+    (or built) <MDTO> or <informatieobject> element or tree, such as the
+    result of `Informatieobject.to_xml()`, can be passed as well.
+
+    Note:
+        Results are cached by path, size, modification time and inode (see
+        `_file_key()`), as many Bestand objects typically refer to the same
+        informatieobject.
 
     Args:
-        informatieobject (TextIO): XML file to infer VerwijzingGegevens from
+        informatieobject (TextIO | str | ET.Element | ET._ElementTree): XML file
+            (or element or tree) to infer VerwijzingGegevens from
 
     Returns:
         `VerwijzingGegevens`, refering to the informatieobject specified by `informatieobject`
     """
 
-    id_gegevens = None
-    namespaces = {"mdto": "https://www.nationaalarchief.nl/mdto"}
-    tree = ET.parse(informatieobject)
-    root = tree.getroot()
+    if isinstance(informatieobject, ET._ElementTree):
+        # e.g. the result of to_xml() or ET.parse()
+        informatieobject = informatieobject.getroot()
+
+    if isinstance(informatieobject, ET._Element):
+        naam, kenmerk, bron = _verwijzing_from_element(informatieobject)
+        return _verwijzing_gegevens(informatieobject, naam, kenmerk, bron)
+
+    if isinstance(informatieobject, os.PathLike):
+        informatieobject = os.fspath(informatieobject)
 
-    id_xpath = ".//mdto:informatieobject/mdto:identificatie/"
+    # only read files from disk by path if they really are that file; the
+    # `name` of e.g. a tar member or gzip stream is the path of its archive
+    path = _regular_file_path(informatieobject)
+    try:
+        # a single stat() call both checks that path exists and provides the cache key
+        st = os.stat(path) if path is not None else None
+    except OSError:
+        st = None
 
-    kenmerk = root.find(id_xpath + "mdto:identificatieKenmerk", namespaces=namespaces)
-    bron = root.find(id_xpath + "mdto:identificatieBron", namespaces=namespaces)
-    naam = root.find(".//mdto:informatieobject/mdto:naam", namespaces=namespaces)
+    if st is not None:
+        naam, kenmerk, bron = _parse_verwijzing_cached(_file_key(path, st))
+    else:
+        # e.g. an in-memory file or tar member; these cannot be cached.
+        # iterparse() only reads bytes, so parse text streams via their binary buffer
+        stream = getattr(informatieobject, "buffer", informatieobject)
+        if isinstance(stream, io.TextIOBase):
+            # text streams without a buffer, such as io.StringIO; the text is
+            # encoded as UTF-8, whatever encoding its XML declaration mentions
+            stream = io.BytesIO(stream.read().encode("utf-8"))
+            naam, kenmerk, bron = _parse_verwijzing(stream, encoding="utf-8")
+        else:
+            naam, kenmerk, bron = _parse_verwijzing(stream)
+
+    return _verwijzing_gegevens(informatieobject, naam, kenmerk, bron)
 
-    # bool(ET.Element) == False, according to the docs
-    # So use ¬p and ¬q == ¬(p or q)
-    if not (kenmerk is None or bron is None):
-        id_gegevens = IdentificatieGegevens(kenmerk.text, bron.text)
 
+def _verwijzing_gegevens(informatieobject, naam, kenmerk, bron) -> VerwijzingGegevens:
+    """Build the VerwijzingGegevens returned by `detect_verwijzing()`."""
     if naam is None:
         _error(f"informatieobject in {informatieobject} " "lacks a <naam> tag.")
+
+    # build new objects on each call, so callers cannot modify each other's results
+    if kenmerk is None or bron is None:
+        return VerwijzingGegevens(naam)
     else:
-        return VerwijzingGegevens(naam.text, id_gegevens)
+        return VerwijzingGegevens(naam, IdentificatieGegevens(kenmerk, bron))
+
+
+def _localname(elem: ET.Element) -> str | None:
+    """Return the tag of `elem` without its namespace, or None for e.g. comments."""
+    return ET.QName(elem).localname if isinstance(elem.tag, str) else None
+
+
+def _find_local(elem: ET.Element, localname: str) -> ET.Element | None:
+    """Return the first child of `elem` whose tag (without namespace) is `localname`."""
+    for child in elem:
+        if _localname(child) == localname:
+            return child
+    return None
+
+
+def _verwijzing_from_element(elem: ET.Element) -> tuple:
+    """Like `_parse_verwijzing()`, but for an already parsed <MDTO> or
+    <informatieobject> element.
+
+    Tags are matched by their local name, as elements built by `to_xml()`
+    have no namespace in their tags, whereas parsed elements do.
+    """
+    if _localname(elem) != "informatieobject":
+        elem = _find_local(elem, "informatieobject")
+        if elem is None:
+            return None, None, None
+
+    naam = _find_local(elem, "naam")
+    naam = naam.text if naam is not None else None
+
+    identificatie = _find_local(elem, "identificatie")
+    if identificatie is None:
+        return naam, None, None
+
+    kenmerk = _find_local(identificatie, "identificatieKenmerk")
+    bron = _find_local(identificatie, "identificatieBron")
+    return (
+        naam,
+        kenmerk.text if kenmerk is not None else None,
+        bron.text if bron is not None else None,
+    )
+
+
+def _parse_verwijzing(informatieobject: TextIO | str, encoding: str = None) -> tuple:
+    """Return the text of the <naam>, <identificatieKenmerk>, and <identificatieBron>
+    tags of `informatieobject`. Missing tags are returned as None.
+
+    These tags are near the start of an informatieobject, so the file is parsed
+    incrementally, and parsing stops as soon as all three have been found.
+    If given, `encoding` overrides the encoding of the XML declaration.
+    """
+    found = {}
+    for _, elem in ET.iterparse(
+        informatieobject, tag=(_TAG_NAAM, _TAG_KENMERK, _TAG_BRON), encoding=encoding
+    ):
+        parent = elem.getparent()
+        # only consider <informatieobject>/<naam> and <informatieobject>/<identificatie>/*,
+        # and not e.g. the <identificatieKenmerk> of a <verwijzingIdentificatie>
+        if elem.tag == _TAG_NAAM:
+            matches = parent.tag == _TAG_INFORMATIEOBJECT
+        else:
+            matches = (
+                parent.tag == _TAG_IDENTIFICATIE
+                and parent.getparent().tag == _TAG_INFORMATIEOBJECT
+            )
+
+        # keep the first match, like find() would
+        if matches and elem.tag not in found:
+            found[elem.tag] = elem.text
+            if len(found) == 3:
+                break
+
+    return found.get(_TAG_NAAM), found.get(_TAG_KENMERK), found.get(_TAG_BRON)
+
+
+@lru_cache(maxsize=256)
+def _parse_verwijzing_cached(key: tuple) -> tuple:
+    """Cached version of `_parse_verwijzing()`, where `key` is a `_file_key()`. Apart
+    from the path, the key's items only serve to parse modified files again."""
+    return _parse_verwijzing(key[0])
 
 
 def pronominfo(path: str) -> BegripGegevens:
     # FIXME: format more properly
-    """Use fido library to generate PRONOM information about a file.
+    """Generate PRONOM information about a file.
     This information can be used in the <bestandsformaat> tag.
 
+    Note:
+        The PRONOM information is detected with siegfried (`sf`) if it is in
+        your `PATH`, as siegfried is much faster than fido. Otherwise, fido is used.
+
     Args:
         path (str): path to the file to inspect
 
@@ -888,71 +1283,198 @@ def pronominfo(path: str) -> BegripGegevens:
                 `begripBegrippenLijst`: reference to PRONOM registry
             }
     """
+    return pronominfo_batch([path])[0]
+
+
+def pronominfo_batch(paths: List[str]) -> List[BegripGegevens]:
+    """Generate PRONOM information about many files at once.
+
+    This is equivalent to calling `pronominfo()` on each path, but all files are
+    identified by a single `sf` (or `fido`) process; very long lists of paths are
+    split over a few `sf` processes. This saves paying the program's startup time
+    for each file, which is considerable for fido.
+
+    Args:
+        paths (List[str]): paths to the files to inspect
+
+    Returns:
+        List[BegripGegevens]: PRONOM information for each path, in the same order
+    """
+    if shutil.which("sf"):
+        return _pronominfo_siegfried(paths)
+    else:
+        return _pronominfo_fido(paths)
+
+
+def _pronominfo_siegfried(paths: List[str]) -> List[BegripGegevens]:
+    """Identify `paths` with as few invocations of siegfried as possible."""
+    # paths are passed as arguments, so split them in batches that fit on a command line
+    results = []
+    batch, length = [], 0
+    for path in paths:
+        if batch and length + len(path) > _SF_MAX_ARGS_LENGTH:
+            results += _run_siegfried(batch)
+            batch, length = [], 0
+        batch.append(path)
+        length += len(path) + 1  # plus a separating space
+
+    if batch:
+        results += _run_siegfried(batch)
+
+    return results
+
+
+def _run_siegfried(paths: List[str]) -> List[BegripGegevens]:
+    """Identify `paths` with a single invocation of siegfried."""
+    # -multi lets sf scan files in parallel
+    cmd = ["sf", "-json", "-multi", "256", *paths]
+
+    cmd_result = subprocess.run(cmd, capture_output=True, shell=False, text=True)
+
+    if cmd_result.returncode != 0:
+        _warn(
+            f"siegfried PRONOM detection on file(s) {', '.join(paths)} "
+            f"failed with error '{cmd_result.stderr}'."
+        )
+        # can return None in case PRONOM detection fails and force == True
+        return [None] * len(paths)
+
+    # match results by filename rather than by position, so that files are never
+    # mixed up if sf skips, expands, or reorders any of them
+    sf_files = {}
+    for sf_file in json.loads(cmd_result.stdout)["files"]:
+        sf_files.setdefault(os.path.abspath(sf_file["filename"]), sf_file)
+
+    results = []
+    for path in paths:
+        sf_file = sf_files.get(os.path.abspath(path))
+        if sf_file is None:
+            _warn(f"siegfried did not report on file {path}.")
+            results.append(None)
+            continue
+
+        # siegfried reports issues such as empty files in 'errors'
+        if sf_file["errors"]:
+            _warn(f"siegfried reported '{sf_file['errors']}' for file {path}.")
+
+        matches = [
+            m
+            for m in sf_file["matches"]
+            if m["ns"] == "pronom" and m["id"] != "UNKNOWN"
+        ]
+
+        if matches:
+            if len(matches) > 1:
+                _log(
+                    "Info: siegfried returned more than one PRONOM match "
+                    f"for file {path}. Selecting the first one."
+                )
+            results.append(_pronom_begrip(matches[0]["format"], matches[0]["id"]))
+        else:
+            _warn(f"siegfried failed to detect PRONOM ID of file {path}.")
+            results.append(None)
+
+    return results
+
+
+def _pronom_begrip(formatname: str, puid: str) -> BegripGegevens:
+    """Return the BegripGegevens for a PRONOM format.
+
+    A new object is built on each call, so callers cannot modify each other's results.
+    """
+    return BegripGegevens(
+        begripLabel=formatname,
+        begripCode=puid,
+        begripBegrippenlijst=VerwijzingGegevens(_PRONOM_BEGRIPPENLIJST),
+    )
+
+
+def _pronominfo_fido(paths: List[str]) -> List[BegripGegevens]:
+    """Identify `paths` with a single invocation of fido. This is the fallback
+    for when siegfried is not installed."""
 
     # Note: fido currently lacks a public API
     # Hence, the most robust solution is to invoke fido as a cli program
     # Upstream issue: https://github.com/openpreserve/fido/issues/94
-    # downside is that this is slow, maybe siegfried speeds things up?
+    # downside is that this is slow (fido loads its signatures on every start),
+    # hence all files are passed to one fido process, and siegfried is preferred
 
     # check if fido program exists
     if not shutil.which("fido"):
         _error(
-            "'fido' not found. For installation instructions, "
-            "see https://github.com/openpreserve/fido#installation"
+            "neither 'sf' nor 'fido' found. For installation instructions, "
+            "see https://github.com/richardlehane/siegfried#install or "
+            "https://github.com/openpreserve/fido#installation"
         )
 
+    # fido prints a line per match, so include the filename to tell files apart
     cmd = [
         "fido",
         "-q",
         "-matchprintf",
-        "OK,%(info.formatname)s,%(info.puid)s,\n",
+        "OK\t%(info.filename)s\t%(info.formatname)s\t%(info.puid)s\n",
         "-nomatchprintf",
-        "FAIL",
-        path,
+        "FAIL\t%(info.filename)s\n",
+        # read the paths from stdin, so their number is not limited by the
+        # maximum length of a command line
+        "-input",
+        "-",
     ]
 
     cmd_result = subprocess.run(
-        cmd, capture_output=True, shell=False, text=True, check=True
+        cmd,
+        input="".join(f"{path}\n" for path in paths),
+        capture_output=True,
+        shell=False,
+        text=True,
     )
-    stdout = cmd_result.stdout
     stderr = cmd_result.stderr
-    returncode = cmd_result.returncode
-
-    # fido prints warnings about empty files to stderr
-    if "(empty)" in stderr.lower():
-        _warn(f"file {path} appears to be an empty file!")
-
-    # check for errors
-    if returncode != 0:
-        _warn(f"fido PRONOM detection on file {path} failed with error '{stderr}'.")
-    elif stdout.startswith("OK"):
-        results = stdout.split("\n")
-        if len(results) > 2:  # .split('\n') returns a list of two items
-            _log(
-                "Info: fido returned more than one PRONOM match "
-                f"for file {path}. Selecting the first one."
-            )
 
-        # strip "OK" from the output
-        results = results[0].split(",")[1:]
-        verwijzing = VerwijzingGegevens(verwijzingNaam="PRONOM-register")
-        return BegripGegevens(
-            begripLabel=results[0],
-            begripCode=results[1],
-            begripBegrippenlijst=verwijzing,
+    if cmd_result.returncode != 0:
+        _warn(
+            f"fido PRONOM detection on file(s) {', '.join(paths)} "
+            f"failed with error '{stderr}'."
         )
-    else:
-        _warn(f"fido failed to detect PRONOM ID of file {path}.")
+        # can return None in case PRONOM detection fails and force == True
+        return [None] * len(paths)
+
+    # fido reports files by their normalized path; collect all matches per file
+    matches = {}
+    for line in cmd_result.stdout.splitlines():
+        status, _, rest = line.partition("\t")
+        if status == "OK":
+            # split on the last tabs, as filenames may contain tabs themselves
+            filename, formatname, puid = rest.rsplit("\t", 2)
+            matches.setdefault(filename, []).append((formatname, puid))
+
+    results = []
+    for path in paths:
+        filename = os.path.normpath(path)
+
+        # fido prints warnings about empty files to stderr
+        if f"(empty): Path is: {filename}\n" in stderr:
+            _warn(f"file {path} appears to be an empty file!")
+
+        file_matches = matches.get(filename)
+        if file_matches:
+            if len(file_matches) > 1:
+                _log(
+                    "Info: fido returned more than one PRONOM match "
+                    f"for file {path}. Selecting the first one."
+                )
+            results.append(_pronom_begrip(*file_matches[0]))
+        else:
+            _warn(f"fido failed to detect PRONOM ID of file {path}.")
+            results.append(None)
 
-    # can return None in case PRONOM detection fails and force == True
-    return None
+    return results
 
 
 def create_bestand(
     infile: TextIO | str,
     identificatiekenmerken: List[str] | str,
     identificatiebronnen: List[str] | str,
-    informatieobject: TextIO,
+    informatieobject: TextIO | str | ET.Element | VerwijzingGegevens,
     naam: str = None,
     url: str = None,
     quiet: bool = False,
@@ -969,9 +1491,13 @@ def create_bestand(
         infile (TextIO | str): the file the Bestand object should represent
         identificatiekenmerken (List[str] | str): str or list of str for <identificatieKenmerk> tags
         identificatiebronnen (List[str] | str): str or list of str for <identificatieBron> tags
-        informatieobject (TextIO | str): path or file-like object that
-            represents an MDTO Informatieobject in XML form.
-            Used to infer values for <isRepresentatieVan>.
+        informatieobject (TextIO | str | ET.Element | VerwijzingGegevens): path or
+            file-like object that represents an MDTO Informatieobject in XML form.
+            Used to infer values for <isRepresentatieVan>. Passing a path is
+            preferred: the file is then read by lxml directly, and its
+            parse result is reused by later calls. An already parsed element,
+            or the VerwijzingGegevens returned by `detect_verwijzing()`, is
+            used as is, without reading any file.
         naam (str, optional): value of <naam>. Defaults to the basename of `infile`
         url (str, optional): value of <URLBestand>
         quiet (bool, optional): silence non-fatal warnings
@@ -979,18 +1505,132 @@ def create_bestand(
 
     Example:
         ```python
+        bestand = create_bestand("vergunning.pdf", '34c5-4379-9f1a-5c378', 'Proza (DMS)',
+                                 informatieobject='informatieobject_001.xml')
+        xml = bestand.to_xml()
+
+        # many files representing the same informatieobject
+        verwijzing = detect_verwijzing('informatieobject_001.xml')
+        for scan in ['scan-001.tiff', 'scan-002.tiff']:
+            bestand = create_bestand(scan, scan, 'Corsa', informatieobject=verwijzing)
+        ```
+    """
+    global _force, _quiet
+    _quiet = quiet
+    _force = force
+
+    return _create_bestand(
+        infile,
+        identificatiekenmerken,
+        identificatiebronnen,
+        informatieobject,
+        naam,
+        url,
+    )
 
-        with open('informatieobject_001.xml') as f:
-            bestand = create_bestand("vergunning.pdf", '34c5-4379-9f1a-5c378', 'Proza (DMS)', informatieobject=f)
-            xml = bestand.to_xml()
+
+def create_bestanden(
+    infiles: List[TextIO | str],
+    identificatiekenmerken: List[List[str] | str],
+    identificatiebronnen: List[List[str] | str],
+    informatieobjecten: List[TextIO | str | ET.Element | VerwijzingGegevens],
+    quiet: bool = False,
+    force: bool = False,
+    max_workers: int = None,
+) -> List[Bestand]:
+    """Convenience function for creating many Bestand objects at once.
+
+    This is equivalent to calling `create_bestand()` on each item of `infiles`,
+    except that the files are processed concurrently. This mostly hides the
+    latency of reading the files, and lets each file be hashed on its own core.
+    All files are identified in one go by `sf` (or `fido`); see `pronominfo_batch()`.
+
+    The n-th item of `identificatiekenmerken`, `identificatiebronnen`, and
+    `informatieobjecten` belongs to the n-th item of `infiles`. Values for
+    <naam> default to the basename of each infile; <URLBestand> can be set
+    afterwards through each Bestand's `URLBestand` attribute.
+
+    Args:
+        infiles (List[TextIO | str]): the files the Bestand objects should represent
+        identificatiekenmerken (List[List[str] | str]): <identificatieKenmerk> value(s) per infile
+        identificatiebronnen (List[List[str] | str]): <identificatieBron> value(s) per infile
+        informatieobjecten (List[TextIO | str | ET.Element | VerwijzingGegevens]):
+            the MDTO Informatieobject each infile is a representation of;
+            see `create_bestand()`
+        quiet (bool, optional): silence non-fatal warnings
+        force (bool, optional): do not exit when encountering would-be invalid tag values
+        max_workers (int, optional): number of threads to use; defaults to
+            the default of `concurrent.futures.ThreadPoolExecutor`
+
+    Example:
+        ```python
+        infiles = ['scan-001.tiff', 'scan-002.tiff']
+        bestanden = create_bestanden(infiles, ['001', '002'], ['Corsa', 'Corsa'],
+                                     ['dossier.xml', 'dossier.xml'])
         ```
+
+    Returns:
+        List[Bestand]: a Bestand object for each item of `infiles`, in the same order
     """
+    if not (
+        len(infiles)
+        == len(identificatiekenmerken)
+        == len(identificatiebronnen)
+        == len(informatieobjecten)
+    ):
+        _error(
+            "'infiles', 'identificatiekenmerken', 'identificatiebronnen', "
+            "and 'informatieobjecten' differ in length"
+        )
+
+    # set the globals once, before any of the worker threads read them
     global _force, _quiet
     _quiet = quiet
     _force = force
 
-    # allow infile to be a path (str)
-    infile = _process_file(infile)
+    # concurrent.futures is imported lazily, as it is slow to import and not
+    # needed by code that only builds XML (see also _create_bestand and create_checksums)
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # identify all files with a single siegfried/fido run, instead of starting
+        # a process for every file. This is submitted first, so a thread picks it
+        # up before any of the tasks below start waiting for its result.
+        paths = [_to_path(infile) for infile in infiles]
+        formats = executor.submit(lambda: dict(zip(paths, pronominfo_batch(paths))))
+        identify = lambda path: formats.result()[path]
+
+        # all checksums of one batch share the same <checksumDatum>
+        create = partial(_create_bestand, checksumDatum=_timestamp(), identify=identify)
+
+        return list(
+            executor.map(
+                create,
+                infiles,
+                identificatiekenmerken,
+                identificatiebronnen,
+                informatieobjecten,
+            )
+        )
+
+
+def _create_bestand(
+    infile: TextIO | str,
+    identificatiekenmerken: List[str] | str,
+    identificatiebronnen: List[str] | str,
+    informatieobject: TextIO | str | ET.Element | VerwijzingGegevens,
+    naam: str = None,
+    url: str = None,
+    checksumDatum: str = None,
+    identify=pronominfo,
+) -> Bestand:
+    """Implementation of `create_bestand()`. Unlike `create_bestand()`, this does
+    not set the `_force` and `_quiet` globals, so it's safe to call from multiple threads.
+
+    `identify` is the function that returns the PRONOM information of a path.
+    """
+    # only infile's path is needed; file objects are accepted for backwards compatibility
+    path = _to_path(infile)
 
     # permit setting kenmerk and bron to a string
     if isinstance(identificatiekenmerken, str):
@@ -1010,17 +1650,26 @@ def create_bestand(
     ]
 
     if not naam:
-        naam = os.path.basename(infile.name)
-
-    omvang = os.path.getsize(infile.name)
-    bestandsformaat = pronominfo(infile.name)
-    checksum = create_checksum(infile)
-
-    informatieobject = _process_file(informatieobject)
-    isrepresentatievan = detect_verwijzing(informatieobject)
-
-    informatieobject.close()
-    infile.close()
+        naam = os.path.basename(path)
+
+    # this stat() call also provides the checksum cache key (see _hash_path())
+    st = os.stat(path)
+    omvang = st.st_size
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    # hash the file while fido/siegfried is identifying it and the informatieobject
+    # is parsed, as these steps do not depend on each other
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        digest = executor.submit(_hash_file_cached, _file_key(path, st), "sha256")
+        bestandsformaat = identify(path)
+        if isinstance(informatieobject, VerwijzingGegevens):
+            # copied, so Bestand objects cannot modify each other's <isRepresentatieVan>
+            isrepresentatievan = copy.deepcopy(informatieobject)
+        else:
+            # detect_verwijzing accepts paths, file objects, and elements
+            isrepresentatievan = detect_verwijzing(informatieobject)
+        checksum = _checksum_from_digest(digest.result(), "sha256", checksumDatum)
 
     return Bestand(
         naam, ids, omvang, bestandsformaat, checksum, isrepresentatievan, url
@@ -1036,6 +1685,16 @@ def create_checksum(
     checksum metadata (i.e.  `checksumAlgoritme`, `checksumWaarde`, and
     `checksumDatum`) from that file.
 
+    File-like objects that are not backed by a regular file (e.g. pipes, or
+    members of a tar archive) are hashed from their current position onwards.
+
+    Note:
+        Within a python process, checksums of regular files are cached by path,
+        size, modification time, inode number and inode change time. A file is
+        therefore only read again if one of these changed, which is the case
+        for any modification. Even rewrites that restore the old modification
+        time (e.g. `cp -p`, `rsync -a`) change the inode change time.
+
     Example:
     ```python
     pdf_checksum = create_checksum('document.pdf')
@@ -1044,32 +1703,316 @@ def create_checksum(
     ```
 
     Args:
-        infile (TextIO | str): file-like object to generate checksum data for
+        file_or_filename (TextIO | str): file-like object or path to generate checksum data for
         algorithm (str, optional): checksum algorithm to use; defaults to sha256.
-         For valid values, see https://docs.python.org/3/library/hashlib.html
+         For valid values, see https://docs.python.org/3/library/hashlib.html.
+         "blake3" is supported as well, if the blake3 package is installed
 
     Returns:
         ChecksumGegevens: checksum metadata from `file_or_filename`
     """
-    infile = _process_file(file_or_filename)
-    verwijzing = VerwijzingGegevens(
-        verwijzingNaam="Begrippenlijst ChecksumAlgoritme MDTO"
-    )
+    checksumWaarde = _digest(file_or_filename, algorithm)
+
+    return _checksum_from_digest(checksumWaarde, algorithm)
+
+
+def create_checksums(
+    files: List[TextIO | str], algorithm: str = "sha256", max_workers: int = None
+) -> List[ChecksumGegevens]:
+    """Convience function for creating ChecksumGegevens objects for many files at once.
+
+    This is equivalent to calling `create_checksum()` on each file, except that the
+    files are hashed concurrently. hashlib releases the GIL while hashing, so
+    this scales with the number of CPU cores.
+
+    Example:
+    ```python
+    checksums = create_checksums(['scan-001.tiff', 'scan-002.tiff', 'scan-003.tiff'])
+    ```
+
+    Args:
+        files (List[TextIO | str]): file-like objects or paths to generate checksum data for
+        algorithm (str, optional): checksum algorithm to use; defaults to sha256.
+         For valid values, see https://docs.python.org/3/library/hashlib.html.
+         "blake3" is supported as well, if the blake3 package is installed
+        max_workers (int, optional): number of threads to use; defaults to
+            the default of `concurrent.futures.ThreadPoolExecutor`. Lower this
+            for files on spinning disks, where parallel reads mostly cause seeks
+
+    Returns:
+        List[ChecksumGegevens]: checksum metadata for each file in `files`, in the same order
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        digests = executor.map(partial(_digest, algorithm=algorithm), files)
+        checksumDatum = _timestamp()
+        return [_checksum_from_digest(d, algorithm, checksumDatum) for d in digests]
+
+
+def _checksum_from_digest(
+    checksumWaarde: str, algorithm: str, checksumDatum: str = None
+) -> ChecksumGegevens:
+    """Wrap a precomputed hexdigest in a ChecksumGegevens object.
+
+    `checksumDatum` defaults to the current time. Batch functions pass in a
+    single timestamp, so that all checksums of one run share the same date.
+    """
+    label = _CHECKSUM_ALGORITME_LABELS.get(algorithm.lower())
+    if label is None:
+        label = algorithm.upper().replace("SHA", "SHA-")
 
     checksumAlgoritme = BegripGegevens(
-        begripLabel=algorithm.upper().replace("SHA", "SHA-"),
-        begripBegrippenlijst=verwijzing,
+        begripLabel=label,
+        begripBegrippenlijst=VerwijzingGegevens(_CHECKSUM_ALGORITME_BEGRIPPENLIJST),
     )
 
-    # file_digest() expects a file in binary mode, hence `infile.buffer.raw`
-    # FIXME: this value is not the same on each call?
-    checksumWaarde = hashlib.file_digest(infile.buffer.raw, algorithm).hexdigest()
-
-    checksumDatum = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+    if checksumDatum is None:
+        checksumDatum = _timestamp()
 
     return ChecksumGegevens(checksumAlgoritme, checksumWaarde, checksumDatum)
 
 
+def _timestamp() -> str:
+    """Return the current local time as an xsd:dateTime string (without timezone)."""
+    # time.strftime skips constructing a datetime object first
+    return time.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+# Parsers used by from_file(). These are built once, at import time.
+# Tables map namespaced tags to a (field name, parser) tuple, so that elements
+# can be looked up by their tag directly.
+_MDTO_PREFIX = "{https://www.nationaalarchief.nl/mdto}"
+
+
+def _parsers(**parsers) -> dict:
+    """Return a parser table for MDTO fields `parsers`, keyed on namespaced tags."""
+    return {_MDTO_PREFIX + field: (field, parser) for field, parser in parsers.items()}
+
+
+def _parse_text(node) -> str:
+    return node.text
+
+
+def _parse_int(node) -> int:
+    return int(node.text)
+
+
+def _parse_identificatie(node) -> IdentificatieGegevens:
+    return IdentificatieGegevens(
+        node[0].text,
+        node[1].text,
+    )
+
+
+# this is measurably faster than the _elem_to_mdto variant
+def _parse_verwijzing_gegevens(node) -> VerwijzingGegevens:
+    if len(node) == 1:
+        return VerwijzingGegevens(node[0].text)
+    else:
+        return VerwijzingGegevens(
+            node[0].text,
+            _parse_identificatie(node[1]),
+        )
+
+
+def _elem_to_mdto(elem: ET.Element, mdto_class: type, mdto_xml_parsers: dict):
+    """Construct MDTO class from given XML element, using parsers specified in
+    mdto_xml_parsers.
+
+    Returns:
+        MDTO instance: a initialized MDTO instance of type `mdto_class`
+    """
+    # collect the parsed values of each field that occurs in elem
+    values = {}
+    for child in elem:
+        mdto_field, xml_parser = mdto_xml_parsers[child.tag]
+        values.setdefault(mdto_field, []).append(xml_parser(child))
+
+    # fields without elements become None
+    constructor_args = dict.fromkeys(field for field, _ in mdto_xml_parsers.values())
+    for mdto_field, value in values.items():
+        # Convert one-itemed argument lists to non-lists
+        constructor_args[mdto_field] = value[0] if len(value) == 1 else value
+
+    return mdto_class(**constructor_args)
+
+
+_begrip_parsers = _parsers(
+    begripLabel=_parse_text,
+    begripCode=_parse_text,
+    begripBegrippenlijst=_parse_verwijzing_gegevens,
+)
+_parse_begrip = partial(
+    _elem_to_mdto, mdto_class=BegripGegevens, mdto_xml_parsers=_begrip_parsers
+)
+
+_termijn_parsers = _parsers(
+    termijnTriggerStartLooptijd=_parse_begrip,
+    termijnStartdatumLooptijd=_parse_text,
+    termijnLooptijd=_parse_text,
+    termijnEinddatum=_parse_text,
+)
+_parse_termijn = partial(
+    _elem_to_mdto, mdto_class=TermijnGegevens, mdto_xml_parsers=_termijn_parsers
+)
+
+_beperking_parsers = _parsers(
+    beperkingGebruikType=_parse_begrip,
+    beperkingGebruikNadereBeschrijving=_parse_text,
+    beperkingGebruikDocumentatie=_parse_verwijzing_gegevens,
+    beperkingGebruikTermijn=_parse_termijn,
+)
+_parse_beperking = partial(
+    _elem_to_mdto,
+    mdto_class=BeperkingGebruikGegevens,
+    mdto_xml_parsers=_beperking_parsers,
+)
+
+_raadpleeglocatie_parsers = _parsers(
+    raadpleeglocatieFysiek=_parse_verwijzing_gegevens,
+    raadpleeglocatieOnline=_parse_text,
+)
+_parse_raadpleeglocatie = partial(
+    _elem_to_mdto,
+    mdto_class=RaadpleeglocatieGegevens,
+    mdto_xml_parsers=_raadpleeglocatie_parsers,
+)
+
+_dekking_in_tijd_parsers = _parsers(
+    dekkingInTijdType=_parse_begrip,
+    dekkingInTijdBegindatum=_parse_text,
+    dekkingInTijdEinddatum=_parse_text,
+)
+_parse_dekking_in_tijd = partial(
+    _elem_to_mdto,
+    mdto_class=DekkingInTijdGegevens,
+    mdto_xml_parsers=_dekking_in_tijd_parsers,
+)
+
+_event_parsers = _parsers(
+    eventType=_parse_begrip,
+    eventTijd=_parse_text,
+    eventVerantwoordelijkeActor=_parse_verwijzing_gegevens,
+    eventResultaat=_parse_text,
+)
+_parse_event = partial(
+    _elem_to_mdto, mdto_class=EventGegevens, mdto_xml_parsers=_event_parsers
+)
+
+_gerelateerd_informatieobject_parsers = _parsers(
+    gerelateerdInformatieobjectVerwijzing=_parse_verwijzing_gegevens,
+    gerelateerdInformatieobjectTypeRelatie=_parse_begrip,
+)
+_parse_gerelateerd_informatieobject = partial(
+    _elem_to_mdto,
+    mdto_class=GerelateerdInformatieobjectGegevens,
+    mdto_xml_parsers=_gerelateerd_informatieobject_parsers,
+)
+
+_betrokkene_parsers = _parsers(
+    betrokkeneTypeRelatie=_parse_begrip,
+    betrokkeneActor=_parse_verwijzing_gegevens,
+)
+_parse_betrokkene = partial(
+    _elem_to_mdto, mdto_class=BetrokkeneGegevens, mdto_xml_parsers=_betrokkene_parsers
+)
+
+_checksum_parsers = _parsers(
+    checksumAlgoritme=_parse_begrip,
+    checksumWaarde=_parse_text,
+    checksumDatum=_parse_text,
+)
+_parse_checksum = partial(
+    _elem_to_mdto, mdto_class=ChecksumGegevens, mdto_xml_parsers=_checksum_parsers
+)
+
+_informatieobject_parsers = _parsers(
+    naam=_parse_text,
+    identificatie=_parse_identificatie,
+    aggregatieniveau=_parse_begrip,
+    classificatie=_parse_begrip,
+    trefwoord=_parse_text,
+    omschrijving=_parse_text,
+    raadpleeglocatie=_parse_raadpleeglocatie,
+    dekkingInTijd=_parse_dekking_in_tijd,
+    dekkingInRuimte=_parse_verwijzing_gegevens,
+    taal=_parse_text,
+    event=_parse_event,
+    waardering=_parse_begrip,
+    bewaartermijn=_parse_termijn,
+    informatiecategorie=_parse_begrip,
+    isOnderdeelVan=_parse_verwijzing_gegevens,
+    bevatOnderdeel=_parse_verwijzing_gegevens,
+    heeftRepresentatie=_parse_verwijzing_gegevens,
+    aanvullendeMetagegevens=_parse_verwijzing_gegevens,
+    gerelateerdInformatieobject=_parse_gerelateerd_informatieobject,
+    archiefvormer=_parse_verwijzing_gegevens,
+    betrokkene=_parse_betrokkene,
+    activiteit=_parse_verwijzing_gegevens,
+    beperkingGebruik=_parse_beperking,
+)
+_parse_informatieobject = partial(
+    _elem_to_mdto,
+    mdto_class=Informatieobject,
+    mdto_xml_parsers=_informatieobject_parsers,
+)
+
+_bestand_parsers = _parsers(
+    naam=_parse_text,
+    identificatie=_parse_identificatie,
+    omvang=_parse_int,
+    checksum=_parse_checksum,
+    bestandsformaat=_parse_begrip,
+    URLBestand=_parse_text,
+    isRepresentatieVan=_parse_verwijzing_gegevens,
+)
+_parse_bestand = partial(
+    _elem_to_mdto, mdto_class=Bestand, mdto_xml_parsers=_bestand_parsers
+)
+
+
+def _iterparse_object(xmlfile) -> tuple:
+    """Parse the first child of <MDTO> (i.e. <informatieobject> or <bestand>)
+    incrementally.
+
+    Returns:
+        tuple: the object element, and a generator over its children. Each
+        child is complete when yielded, and is emptied and removed once the
+        next one is requested.
+    """
+    # only report the tags that can occur directly below <informatieobject> or
+    # <bestand>; like _parse_xml(), skip whitespace-only text nodes
+    events = ET.iterparse(
+        xmlfile,
+        tag=(*_informatieobject_parsers, *_bestand_parsers),
+        remove_blank_text=True,
+    )
+    try:
+        _, first_child = next(events)
+    except StopIteration:
+        raise ValueError(
+            f"{xmlfile} does not contain an <informatieobject> or <bestand>"
+        )
+
+    object_elem = first_child.getparent()
+
+    def children():
+        yield first_child
+        first_child.clear()
+        for _, elem in events:
+            # skip nested elements that happen to share a tag name
+            if elem.getparent() is object_elem:
+                # drop the children that have already been parsed
+                while elem.getprevious() is not None:
+                    del object_elem[0]
+                yield elem
+                # free the descendants of elem, now that it has been parsed
+                elem.clear()
+
+    return object_elem, children()
+
+
 # TODO: this type annotation should be redone when the abstract Object class is implemented
 # Q: should this also accept file objects?
 def from_file(xmlfile: str) -> Informatieobject | Bestand:
@@ -1089,9 +2032,7 @@ def from_file(xmlfile: str) -> Informatieobject | Bestand:
     informatieobject.naam = "Verlenen kapvergunning Flipje's Erf 15 Tiel"
 
     # save it to a new file
-    xml = informatieobject.to_xml()
-    with open("Nieuw informatieobject.xml", 'w') as output_file:
-        xml.write(output_file, xml_declaration=True, short_empty_elements=False)
+    informatieobject.write_xml("Nieuw informatieobject.xml")
     ```
 
     Args:
@@ -1101,183 +2042,67 @@ def from_file(xmlfile: str) -> Informatieobject | Bestand:
         Informatieobject | Bestand: A new MDTO object
     """
 
-    # Parsers:
-    def parse_text(node) -> str:
-        return node.text
+    try:
+        is_path = isinstance(xmlfile, (str, os.PathLike))
+        size = os.path.getsize(xmlfile) if is_path else 0
+    except OSError:
+        size = 0  # let lxml report the error
+
+    # Large files (e.g. with many thousands of <bevatOnderdeel> tags) are read
+    # incrementally, so they never have to be held in memory as a whole. This is
+    # slower, so smaller files are parsed in one go.
+    if size > _ITERPARSE_MIN_SIZE:
+        object_elem, children = _iterparse_object(xmlfile)
+    else:
+        object_elem = _parse_xml(xmlfile).getroot()[0]
+        children = object_elem
 
-    def parse_int(node) -> int:
-        return int(node.text)
+    # check if object type is Bestand or Informatieobject
+    object_type = object_elem.tag.removeprefix(_MDTO_PREFIX)
 
-    def parse_identificatie(node) -> IdentificatieGegevens:
-        return IdentificatieGegevens(
-            node[0].text,
-            node[1].text,
+    if object_type == "informatieobject":
+        return _parse_informatieobject(children)
+    elif object_type == "bestand":
+        return _parse_bestand(children)
+    else:
+        raise ValueError(
+            f"Unexpected first child <{object_type}> in <MDTO>: "
+            "expected <informatieobject> or <bestand>."
         )
 
-    # this is measurably faster than the elem_to_mdto variant
-    def parse_verwijzing(node) -> VerwijzingGegevens:
-        if len(node) == 1:
-            return VerwijzingGegevens(node[0].text)
-        else:
-            return VerwijzingGegevens(
-                node[0].text,
-                parse_identificatie(node[1]),
-            )
-
-    def elem_to_mdto(elem: ET.Element, mdto_class: classmethod, mdto_xml_parsers: dict):
-        """Construct MDTO class from given XML element, using parsers specified in
-        mdto_xml_parsers.
-
-        Returns:
-            MDTO instance: a initialized MDTO instance of type `mdto_class`
-        """
-        # initialize dictionary of keyword arguments (to be passed to MDTO class constructor)
-        constructor_args = {mdto_field: [] for mdto_field in mdto_xml_parsers}
 
-        for child in elem:
-            mdto_field = child.tag.removeprefix(
-                "{https://www.nationaalarchief.nl/mdto}"
-            )
-            # retrieve parser
-            xml_parser = mdto_xml_parsers[mdto_field]
-            # add value of parsed child element to class constructor args
-            constructor_args[mdto_field].append(xml_parser(child))
-
-        for argname, value in constructor_args.items():
-            # Convert empty argument lists into None values
-            if len(value) == 0:
-                constructor_args[argname] = None
-            # Convert one-itemed argument lists to non-lists
-            elif len(value) == 1:
-                constructor_args[argname] = value[0]
-
-        return mdto_class(**constructor_args)
-
-    begrip_parsers = {
-        "begripLabel": parse_text,
-        "begripCode": parse_text,
-        "begripBegrippenlijst": parse_verwijzing,
-    }
-    parse_begrip = lambda e: elem_to_mdto(e, BegripGegevens, begrip_parsers)
-
-    termijn_parsers = {
-        "termijnTriggerStartLooptijd": parse_begrip,
-        "termijnStartdatumLooptijd": parse_text,
-        "termijnLooptijd": parse_text,
-        "termijnEinddatum": parse_text,
-    }
-    parse_termijn = lambda e: elem_to_mdto(e, TermijnGegevens, termijn_parsers)
-
-    beperking_parsers = {
-        "beperkingGebruikType": parse_begrip,
-        "beperkingGebruikNadereBeschrijving": parse_text,
-        "beperkingGebruikDocumentatie": parse_verwijzing,
-        "beperkingGebruikTermijn": parse_termijn,
-    }
-    parse_beperking = lambda e: elem_to_mdto(
-        e, BeperkingGebruikGegevens, beperking_parsers
-    )
+def from_files(
+    xmlfiles: List[str], max_workers: int = None
+) -> List[Informatieobject | Bestand]:
+    """Construct Informatieobject/Bestand objects from many MDTO XML files at once.
 
-    raadpleeglocatie_parsers = {
-        "raadpleeglocatieFysiek": parse_verwijzing,
-        "raadpleeglocatieOnline": parse_text,
-    }
-    parse_raadpleeglocatie = lambda e: elem_to_mdto(
-        e, RaadpleeglocatieGegevens, raadpleeglocatie_parsers
-    )
+    This is equivalent to calling `from_file()` on each file, except that the files
+    are parsed by a pool of worker processes. Unlike hashing, converting XML to
+    MDTO objects happens mostly in Python, so threads would not scale here.
 
-    dekking_in_tijd_parsers = {
-        "dekkingInTijdType": parse_begrip,
-        "dekkingInTijdBegindatum": parse_text,
-        "dekkingInTijdEinddatum": parse_text,
-    }
-    parse_dekking_in_tijd = lambda e: elem_to_mdto(
-        e, DekkingInTijdGegevens, dekking_in_tijd_parsers
-    )
+    Note:
+        Starting worker processes takes a moment, so this only pays off for
+        many (or large) files. On platforms that start workers with 'spawn'
+        (Windows, macOS), call this from within an `if __name__ == "__main__":` block.
 
-    event_parsers = {
-        "eventType": parse_begrip,
-        "eventTijd": parse_text,
-        "eventVerantwoordelijkeActor": parse_verwijzing,
-        "eventResultaat": parse_text,
-    }
-    parse_event = lambda e: elem_to_mdto(e, EventGegevens, event_parsers)
-
-    gerelateerd_informatieobject_parsers = {
-        "gerelateerdInformatieobjectVerwijzing": parse_verwijzing,
-        "gerelateerdInformatieobjectTypeRelatie": parse_begrip,
-    }
-    parse_gerelateerd_informatieobject = lambda e: elem_to_mdto(
-        e, GerelateerdInformatieobjectGegevens, gerelateerd_informatieobject_parsers
-    )
+    Example:
+    ```python
+    from pathlib import Path
 
-    betrokkene_parsers = {
-        "betrokkeneTypeRelatie": parse_begrip,
-        "betrokkeneActor": parse_verwijzing,
-    }
-    parse_betrokkene = lambda e: elem_to_mdto(e, BetrokkeneGegevens, betrokkene_parsers)
-
-    checksum_parsers = {
-        "checksumAlgoritme": parse_begrip,
-        "checksumWaarde": parse_text,
-        "checksumDatum": parse_text,
-    }
-    parse_checksum = lambda e: elem_to_mdto(e, ChecksumGegevens, checksum_parsers)
-
-    informatieobject_parsers = {
-        "naam": parse_text,
-        "identificatie": parse_identificatie,
-        "aggregatieniveau": parse_begrip,
-        "classificatie": parse_begrip,
-        "trefwoord": parse_text,
-        "omschrijving": parse_text,
-        "raadpleeglocatie": parse_raadpleeglocatie,
-        "dekkingInTijd": parse_dekking_in_tijd,
-        "dekkingInRuimte": parse_verwijzing,
-        "taal": parse_text,
-        "event": parse_event,
-        "waardering": parse_begrip,
-        "bewaartermijn": parse_termijn,
-        "informatiecategorie": parse_begrip,
-        "isOnderdeelVan": parse_verwijzing,
-        "bevatOnderdeel": parse_verwijzing,
-        "heeftRepresentatie": parse_verwijzing,
-        "aanvullendeMetagegevens": parse_verwijzing,
-        "gerelateerdInformatieobject": parse_gerelateerd_informatieobject,
-        "archiefvormer": parse_verwijzing,
-        "betrokkene": parse_betrokkene,
-        "activiteit": parse_verwijzing,
-        "beperkingGebruik": parse_beperking,
-    }
-    parse_informatieobject = lambda e: elem_to_mdto(
-        e, Informatieobject, informatieobject_parsers
-    )
+    bestanden = mdto.from_files([str(p) for p in Path('.').rglob('*.bestand.mdto.xml')])
+    ```
 
-    bestand_parsers = {
-        "naam": parse_text,
-        "identificatie": parse_identificatie,
-        "omvang": parse_int,
-        "checksum": parse_checksum,
-        "bestandsformaat": parse_begrip,
-        "URLBestand": parse_text,
-        "isRepresentatieVan": parse_verwijzing,
-    }
-    parse_bestand = lambda e: elem_to_mdto(e, Bestand, bestand_parsers)
-
-    # read xmlfile
-    tree = ET.parse(xmlfile)
-    root = tree.getroot()
-    children = list(root[0])
+    Args:
+        xmlfiles (List[str]): paths of the MDTO XML files to construct objects from
+        max_workers (int, optional): number of processes to use; defaults to
+            the default of `concurrent.futures.ProcessPoolExecutor`
 
-    # check if object type is Bestand or Informatieobject
-    object_type = root[0].tag.removeprefix("{https://www.nationaalarchief.nl/mdto}")
+    Returns:
+        List[Informatieobject | Bestand]: an MDTO object for each item of
+        `xmlfiles`, in the same order
+    """
+    from concurrent.futures import ProcessPoolExecutor
 
-    if object_type == "informatieobject":
-        return parse_informatieobject(children)
-    elif object_type == "bestand":
-        return parse_bestand(children)
-    else:
-        raise ValueError(
-            f"Unexpected first child <{object_type}> in <MDTO>: "
-            "expected <informatieobject> or <bestand>."
-        )
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # send files in chunks, to limit the number of round trips between processes
+        return list(executor.map(from_file, xmlfiles, chunksize=32))
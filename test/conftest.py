@@ -70,3 +70,73 @@ def voorbeeld_serie_xml(mdto_example_files):
 @pytest.fixture
 def voorbeeld_bestand_xml(mdto_example_files):
     return mdto_example_files["Bestand.xml"]
+
+
+@pytest.fixture
+def informatieobject():
+    """An Informatieobject built in code, so tests do not depend on the example files"""
+    from mdto import (
+        Informatieobject,
+        IdentificatieGegevens,
+        BegripGegevens,
+        VerwijzingGegevens,
+        BeperkingGebruikGegevens,
+    )
+
+    return Informatieobject(
+        naam="Verlenen kapvergunning Hooigracht 21 Den Haag",
+        identificatie=IdentificatieGegevens("Informatieobject-4661a", "Proza"),
+        waardering=BegripGegevens(
+            "Tijdelijk te bewaren",
+            VerwijzingGegevens("Begrippenlijst Waarderingen MDTO"),
+            "V",
+        ),
+        archiefvormer=VerwijzingGegevens("'s-Gravenhage"),
+        beperkingGebruik=BeperkingGebruikGegevens(
+            BegripGegevens("Auteurswet", VerwijzingGegevens("Begrippenlijst"))
+        ),
+        trefwoord=["kapvergunning", "bomen"],
+        bevatOnderdeel=[VerwijzingGegevens(f"Onderdeel {i}") for i in range(3)],
+    )
+
+
+@pytest.fixture
+def informatieobject_xml(informatieobject, tmp_path):
+    """Path to an XML file of the `informatieobject` fixture"""
+    xmlfile = tmp_path / "informatieobject.xml"
+    xml = informatieobject.to_xml()
+    xml.write(str(xmlfile), xml_declaration=True, encoding="UTF-8")
+    return str(xmlfile)
+
+
+@pytest.fixture
+def bestand():
+    """A Bestand built in code, so tests do not depend on files on disk"""
+    from mdto import (
+        Bestand,
+        IdentificatieGegevens,
+        BegripGegevens,
+        VerwijzingGegevens,
+        ChecksumGegevens,
+    )
+
+    return Bestand(
+        naam="vergunning.pdf",
+        identificatie=IdentificatieGegevens("34c5-4379-9f1a-5c378", "Proza (DMS)"),
+        omvang=1089910,
+        bestandsformaat=BegripGegevens(
+            "Acrobat PDF/A", VerwijzingGegevens("PRONOM-register"), "fmt/354"
+        ),
+        checksum=ChecksumGegevens(
+            BegripGegevens(
+                "SHA-256", VerwijzingGegevens("Begrippenlijst ChecksumAlgoritme MDTO")
+            ),
+            "857ee09fb53f647b16b1f96aba542ace454cd6fc52c9844d4ddb8218c5d61b6c",
+            "2024-02-15T16:15:33",
+        ),
+        isRepresentatieVan=VerwijzingGegevens(
+            "Verlenen kapvergunning Hooigracht 21 Den Haag",
+            IdentificatieGegevens("Informatieobject-4661a", "Proza"),
+        ),
+        URLBestand="https://www.example.com/vergunning.pdf",
+    )
@@ -0,0 +1,265 @@
+import hashlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tarfile
+
+import lxml.etree as ET
+import pytest
+
+import mdto
+from mdto import (
+    RaadpleeglocatieGegevens,
+    create_bestand,
+    create_bestanden,
+    detect_verwijzing,
+    pronominfo,
+)
+
+
+def test_detect_verwijzing_tar_member(informatieobject_xml, tmp_path):
+    """Test that file objects are parsed from the stream, and not from disk by their
+    `name` (which, for tar members, is the path of the archive)"""
+    archive = tmp_path / "informatieobjecten.tar"
+    with tarfile.open(archive, "w") as tar:
+        tar.add(informatieobject_xml, arcname="io1.xml")
+
+    with tarfile.open(archive) as tar:
+        verwijzing = detect_verwijzing(tar.extractfile("io1.xml"))
+
+    assert verwijzing == detect_verwijzing(informatieobject_xml)
+    assert verwijzing.verwijzingNaam == "Verlenen kapvergunning Hooigracht 21 Den Haag"
+    identificatie = verwijzing.verwijzingIdentificatie
+    assert identificatie.identificatieKenmerk == "Informatieobject-4661a"
+
+
+def test_detect_verwijzing_text_stream(informatieobject_xml, tmp_path):
+    """Test that text streams (e.g. pipes, sys.stdin, or a wrapped tar member) are accepted"""
+    expected = detect_verwijzing(informatieobject_xml)
+
+    archive = tmp_path / "informatieobjecten.tar"
+    with tarfile.open(archive, "w") as tar:
+        tar.add(informatieobject_xml, arcname="io1.xml")
+
+    with tarfile.open(archive) as tar:
+        member = io.TextIOWrapper(tar.extractfile("io1.xml"), encoding="utf-8")
+        assert detect_verwijzing(member) == expected
+
+    with subprocess.Popen(
+        [sys.executable, "-c", "import sys; sys.stdout.write(sys.stdin.read())"],
+        stdin=open(informatieobject_xml),
+        stdout=subprocess.PIPE,
+        text=True,
+    ) as proc:
+        assert detect_verwijzing(proc.stdout) == expected
+
+    with open(informatieobject_xml, encoding="utf-8") as f:
+        assert detect_verwijzing(io.StringIO(f.read())) == expected
+
+
+def test_detect_verwijzing_rewrite_with_old_mtime(informatieobject_xml):
+    """Test that an informatieobject that is rewritten with the same size and
+    modification time (like `cp -p` or `rsync -a` can do) is parsed again"""
+    with open(informatieobject_xml, "rb") as f:
+        xml = f.read()
+    assert detect_verwijzing(informatieobject_xml).verwijzingIdentificatie
+    st = os.stat(informatieobject_xml)
+
+    with open(informatieobject_xml, "wb") as f:
+        f.write(xml.replace(b"Informatieobject-4661a", b"Informatieobject-4661b"))
+    os.utime(informatieobject_xml, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    identificatie = detect_verwijzing(informatieobject_xml).verwijzingIdentificatie
+    assert identificatie.identificatieKenmerk == "Informatieobject-4661b"
+
+
+@pytest.mark.parametrize("tree", ["built", "parsed"])
+def test_detect_verwijzing_element(informatieobject, informatieobject_xml, tree):
+    """Test that both built (namespace-less) and parsed XML trees, and their
+    root elements, are accepted"""
+    if tree == "built":
+        xml = informatieobject.to_xml()
+    else:
+        xml = ET.parse(informatieobject_xml)
+
+    expected = detect_verwijzing(informatieobject_xml)
+    assert detect_verwijzing(xml) == expected
+    assert detect_verwijzing(xml.getroot()) == expected
+    assert detect_verwijzing(xml.getroot()[0]) == expected
+
+
+def test_create_bestand_element(informatieobject, tmp_path):
+    """Test that create_bestand() accepts an in-memory informatieobject"""
+    infile = tmp_path / "bestand.txt"
+    infile.write_text("Verlenen kapvergunning Hooigracht 21 Den Haag")
+
+    bestand = create_bestand(
+        str(infile), "1", "Corsa", informatieobject=informatieobject.to_xml().getroot()
+    )
+
+    assert bestand.isRepresentatieVan.verwijzingNaam == informatieobject.naam
+
+
+def test_create_bestand_verwijzing(informatieobject_xml, tmp_path):
+    """Test that a VerwijzingGegevens is used as is, and copied for each Bestand"""
+    infile = tmp_path / "bestand.txt"
+    infile.write_text("Verlenen kapvergunning Hooigracht 21 Den Haag")
+    verwijzing = detect_verwijzing(informatieobject_xml)
+
+    bestand1 = create_bestand(str(infile), "1", "Corsa", informatieobject=verwijzing)
+    bestand2 = create_bestand(str(infile), "2", "Corsa", informatieobject=verwijzing)
+    bestand1.isRepresentatieVan.verwijzingNaam = "aangepast"
+
+    assert bestand2.isRepresentatieVan == verwijzing
+    assert verwijzing.verwijzingNaam == "Verlenen kapvergunning Hooigracht 21 Den Haag"
+
+
+def test_pronominfo_not_shared(tmp_path):
+    """Test that modifying the result of pronominfo() does not affect later results"""
+    infile = tmp_path / "bestand.txt"
+    infile.write_text("Verlenen kapvergunning Hooigracht 21 Den Haag")
+
+    bestandsformaat = pronominfo(str(infile))
+    label = bestandsformaat.begripLabel
+    bestandsformaat.begripLabel = "aangepast"
+
+    assert pronominfo(str(infile)).begripLabel == label
+
+
+def test_pronominfo_siegfried_batches(monkeypatch):
+    """Test that siegfried results are matched by filename, and that long
+    lists of paths are split over several sf invocations"""
+    formats = {"a.txt": "x-fmt/111", "b.pdf": "fmt/276", "c.xml": "fmt/101"}
+    calls = []
+
+    def fake_sf(cmd, **kwargs):
+        paths = cmd[4:]
+        calls.append(paths)
+        files = [
+            {
+                "filename": path,
+                "errors": "",
+                "matches": [{"ns": "pronom", "id": formats[path], "format": path}],
+            }
+            # report in reverse order, and skip c.xml
+            for path in reversed(paths)
+            if path != "c.xml"
+        ]
+        stdout = json.dumps({"files": files})
+        return subprocess.CompletedProcess(cmd, 0, stdout, "")
+
+    monkeypatch.setattr(mdto.mdto.subprocess, "run", fake_sf)
+    monkeypatch.setattr(mdto.mdto, "_SF_MAX_ARGS_LENGTH", 12)
+    monkeypatch.setattr(mdto.mdto, "_force", True)
+
+    results = mdto.mdto._pronominfo_siegfried(["a.txt", "b.pdf", "c.xml"])
+
+    assert calls == [["a.txt", "b.pdf"], ["c.xml"]]
+    assert [r and r.begripCode for r in results] == ["x-fmt/111", "fmt/276", None]
+
+
+def test_pronominfo_fido_batch(tmp_path, monkeypatch, capsys):
+    """Test that a single fido run returns the PRONOM information of each file, in order"""
+    (tmp_path / "tekst.txt").write_text("Verlenen kapvergunning Hooigracht 21 Den Haag")
+    (tmp_path / "informatieobject.xml").write_text('<?xml version="1.0"?><a/>')
+    (tmp_path / "leeg.txt").write_bytes(b"")
+    paths = [
+        str(tmp_path / "informatieobject.xml"),
+        # fido reports normalized paths
+        str(tmp_path / "." / "tekst.txt"),
+        str(tmp_path / "leeg.txt"),
+    ]
+    monkeypatch.setattr(mdto.mdto, "_force", True)
+
+    results = mdto.mdto._pronominfo_fido(paths)
+
+    assert len(results) == 3
+    assert [r.begripCode for r in results[:2]] == ["fmt/101", "x-fmt/111"]
+    assert results[0].begripLabel == "Extensible Markup Language"
+
+    # only the empty file is reported as such
+    warnings = capsys.readouterr().err
+    assert f"file {paths[2]} appears to be an empty file!" in warnings
+    assert f"file {paths[1]} appears to be an empty file!" not in warnings
+
+
+def test_create_bestanden(informatieobject_xml, tmp_path):
+    """Test that create_bestanden() returns Bestand objects in the order of its input,
+    which share a single <checksumDatum>"""
+    infiles = []
+    for i in range(4):
+        infile = tmp_path / f"bestand-{i}.txt"
+        infile.write_text(f"Bestand nummer {i}")
+        infiles.append(str(infile))
+
+    bestanden = create_bestanden(
+        infiles,
+        [f"kenmerk-{i}" for i in range(4)],
+        ["Corsa"] * 4,
+        [informatieobject_xml] * 4,
+    )
+
+    assert [b.naam for b in bestanden] == [f"bestand-{i}.txt" for i in range(4)]
+    assert [b.identificatie[0].identificatieKenmerk for b in bestanden] == [
+        f"kenmerk-{i}" for i in range(4)
+    ]
+    assert [b.checksum.checksumWaarde for b in bestanden] == [
+        hashlib.sha256(f"Bestand nummer {i}".encode()).hexdigest() for i in range(4)
+    ]
+    assert len({b.checksum.checksumDatum for b in bestanden}) == 1
+    assert all(
+        b.isRepresentatieVan == detect_verwijzing(informatieobject_xml)
+        for b in bestanden
+    )
+
+
+def test_create_bestanden_length_mismatch(informatieobject_xml, tmp_path):
+    """Test that create_bestanden() refuses lists of different lengths"""
+    infile = tmp_path / "bestand.txt"
+    infile.write_text("Verlenen kapvergunning Hooigracht 21 Den Haag")
+
+    with pytest.raises(SystemExit):
+        create_bestanden(
+            [str(infile)], ["kenmerk-1", "kenmerk-2"], ["Corsa"], [informatieobject_xml]
+        )
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://www.example.com/vergunning.pdf",
+        "urn:isbn:9789012345678",
+        ["https://www.example.com/a.pdf", "https://www.example.com/b.pdf"],
+    ],
+)
+def test_url_valid(url, bestand, capsys):
+    """Test that valid URLs (or lists thereof) are accepted without a warning"""
+    raadpleeglocatie = RaadpleeglocatieGegevens(raadpleeglocatieOnline=url)
+    if isinstance(url, str):
+        bestand.URLBestand = url
+
+    assert raadpleeglocatie.raadpleeglocatieOnline == url
+    assert capsys.readouterr().err == ""
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "www.example.com",
+        "https://www.example.com/\n",
+        "https://www.example.com/met spatie.pdf",
+        ["https://www.example.com/a.pdf", "geen url"],
+    ],
+)
+def test_url_malformed(url, bestand, monkeypatch, capsys):
+    """Test that malformed URLs cause a warning, but are kept when forced"""
+    with pytest.raises(SystemExit):
+        RaadpleeglocatieGegevens(raadpleeglocatieOnline=url)
+
+    monkeypatch.setattr(mdto.mdto, "_force", True)
+    bestand.URLBestand = url
+
+    assert bestand.URLBestand == url
+    assert "is malformed" in capsys.readouterr().err
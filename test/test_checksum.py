@@ -0,0 +1,154 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+import mdto
+from mdto import create_checksum, create_checksums
+
+
+def test_create_checksum(tmp_path):
+    """Test that create_checksum() matches hashlib"""
+    infile = tmp_path / "bestand.txt"
+    infile.write_bytes(b"Verlenen kapvergunning Hooigracht 21 Den Haag")
+
+    checksum = create_checksum(str(infile), algorithm="sha512")
+
+    assert checksum.checksumWaarde == hashlib.sha512(infile.read_bytes()).hexdigest()
+    assert checksum.checksumAlgoritme.begripLabel == "SHA-512"
+
+
+def test_create_checksums(tmp_path):
+    """Test that create_checksums() returns checksums in the same order as its input"""
+    paths = []
+    for i in range(5):
+        infile = tmp_path / f"bestand-{i}.txt"
+        infile.write_bytes(bytes(i * 1000))
+        paths.append(str(infile))
+
+    checksums = create_checksums(paths)
+
+    assert [c.checksumWaarde for c in checksums] == [
+        hashlib.sha256(bytes(i * 1000)).hexdigest() for i in range(5)
+    ]
+
+
+def test_checksum_algoritme_label(tmp_path):
+    """Test that checksum algorithms get their conventional labels"""
+    infile = tmp_path / "bestand.txt"
+    infile.write_bytes(b"")
+
+    assert create_checksum(str(infile), "sha1").checksumAlgoritme.begripLabel == "SHA-1"
+    assert (
+        create_checksum(str(infile), "sha3_256").checksumAlgoritme.begripLabel
+        == "SHA3-256"
+    )
+
+
+def test_create_checksum_pathlike(tmp_path):
+    """Test that create_checksum() accepts os.PathLike objects, such as pathlib.Path"""
+    infile = tmp_path / "bestand.txt"
+    infile.write_bytes(b"Verlenen kapvergunning Hooigracht 21 Den Haag")
+
+    checksum = create_checksum(infile)
+
+    assert checksum.checksumWaarde == hashlib.sha256(infile.read_bytes()).hexdigest()
+
+
+def test_checksum_begrippenlijst_not_shared(tmp_path):
+    """Test that modifying one checksum's begrippenlijst does not affect later checksums"""
+    infile = tmp_path / "bestand.txt"
+    infile.write_bytes(b"")
+
+    begrippenlijst = create_checksum(str(infile)).checksumAlgoritme.begripBegrippenlijst
+    begrippenlijst.verwijzingNaam = "aangepast"
+
+    checksum = create_checksum(str(infile))
+    assert (
+        checksum.checksumAlgoritme.begripBegrippenlijst.verwijzingNaam
+        == "Begrippenlijst ChecksumAlgoritme MDTO"
+    )
+
+
+def test_create_checksum_rewrite_with_old_mtime(tmp_path):
+    """Test that a file that is rewritten with the same size and modification time
+    (like `cp -p` or `rsync -a` can do) is hashed again"""
+    infile = tmp_path / "bestand.txt"
+    infile.write_bytes(b"versie 1")
+    old_checksum = create_checksum(str(infile))
+    st = os.stat(infile)
+
+    infile.write_bytes(b"versie 2")
+    os.utime(infile, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    checksum = create_checksum(str(infile))
+
+    assert checksum.checksumWaarde != old_checksum.checksumWaarde
+    assert checksum.checksumWaarde == hashlib.sha256(b"versie 2").hexdigest()
+
+
+@pytest.mark.parametrize("size", [0, 1, 3 * 1024 * 1024 + 7])
+def test_create_checksum_blake3(tmp_path, monkeypatch, size):
+    """Test that BLAKE3 checksums match the blake3 package, both for memory-mapped
+    files and for files that blake3 maps itself (using multiple threads)"""
+    blake3 = pytest.importorskip("blake3")
+    monkeypatch.setattr(mdto.mdto, "_MMAP_MAX_SIZE", 1024 * 1024)
+    monkeypatch.setattr(mdto.mdto, "_BLAKE3_MULTITHREADING_MIN_SIZE", 1024 * 1024)
+    infile = tmp_path / "bestand.bin"
+    data = os.urandom(size)
+    infile.write_bytes(data)
+
+    checksum = create_checksum(str(infile), "blake3")
+
+    assert checksum.checksumWaarde == blake3.blake3(data).hexdigest()
+    assert checksum.checksumAlgoritme.begripLabel == "BLAKE3"
+
+
+def test_create_checksum_chunked(tmp_path, monkeypatch):
+    """Test that files larger than _MMAP_MAX_SIZE are hashed correctly in chunks"""
+    monkeypatch.setattr(mdto.mdto, "_MMAP_MAX_SIZE", 1024)
+    infile = tmp_path / "bestand.bin"
+    # not a multiple of the chunk size, so the last chunk is partial
+    data = os.urandom(3 * mdto.mdto._HASH_CHUNK_SIZE + 7)
+    infile.write_bytes(data)
+
+    checksum = create_checksum(str(infile), "sha256")
+
+    assert checksum.checksumWaarde == hashlib.sha256(data).hexdigest()
+
+
+def test_create_checksum_mmap_unsupported(tmp_path, monkeypatch):
+    """Test that files which cannot be memory-mapped are hashed in chunks instead"""
+
+    def mmap_unsupported(*args, **kwargs):
+        raise OSError("mmap not supported")
+
+    monkeypatch.setattr(mdto.mdto.mmap, "mmap", mmap_unsupported)
+    infile = tmp_path / "bestand.bin"
+    data = os.urandom(100_000)
+    infile.write_bytes(data)
+
+    assert (
+        create_checksum(str(infile)).checksumWaarde == hashlib.sha256(data).hexdigest()
+    )
+
+
+class _ReadOnlyStream:
+    """A binary stream without readinto(), such as some third-party file objects"""
+
+    def __init__(self, data):
+        self._stream = io.BytesIO(data)
+
+    def read(self, size=-1):
+        return self._stream.read(size)
+
+
+@pytest.mark.parametrize("stream_type", [io.BytesIO, _ReadOnlyStream])
+def test_create_checksum_stream(stream_type):
+    """Test that file objects are hashed from their stream, with or without readinto()"""
+    data = os.urandom(2 * mdto.mdto._HASH_CHUNK_SIZE + 7)
+
+    checksum = create_checksum(stream_type(data), "sha256")
+
+    assert checksum.checksumWaarde == hashlib.sha256(data).hexdigest()
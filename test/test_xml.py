@@ -0,0 +1,79 @@
+import io
+import pytest
+
+import mdto
+
+
+def to_xml_bytes(mdto_object, pretty_print: bool) -> bytes:
+    """Serialize `mdto_object` the way the README does, through to_xml()"""
+    output = io.BytesIO()
+    xml = mdto_object.to_xml(pretty_print=pretty_print)
+    xml.write(output, xml_declaration=True, encoding="UTF-8")
+    return output.getvalue()
+
+
+@pytest.mark.parametrize("pretty_print", [True, False])
+@pytest.mark.parametrize("mdto_object", ["informatieobject", "bestand"])
+def test_write_xml_matches_to_xml(mdto_object, pretty_print, request):
+    """Test that write_xml() writes the same bytes as to_xml().write()"""
+    mdto_object = request.getfixturevalue(mdto_object)
+
+    output = io.BytesIO()
+    mdto_object.write_xml(output, pretty_print=pretty_print)
+
+    assert output.getvalue() == to_xml_bytes(mdto_object, pretty_print)
+
+
+@pytest.mark.parametrize("pretty_print", [True, False])
+def test_write_xml_text_stream(informatieobject, pretty_print):
+    """Test that write_xml() to a text stream (e.g. sys.stdout) writes the same bytes"""
+    output = io.TextIOWrapper(io.BytesIO(), encoding="UTF-8")
+    informatieobject.write_xml(output, pretty_print=pretty_print)
+    output.flush()
+
+    assert output.buffer.getvalue() == to_xml_bytes(informatieobject, pretty_print)
+
+
+@pytest.mark.parametrize("mdto_object", ["informatieobject", "bestand"])
+def test_from_file_incremental(mdto_object, request, tmp_path, monkeypatch):
+    """Test that from_file() returns the same objects when reading large files
+    incrementally as when parsing them in one go"""
+    mdto_object = request.getfixturevalue(mdto_object)
+    xmlfile = str(tmp_path / "object.xml")
+    mdto_object.write_xml(xmlfile)
+
+    parsed = mdto.from_file(xmlfile)
+    # treat all files as large
+    monkeypatch.setattr(mdto.mdto, "_ITERPARSE_MIN_SIZE", 0)
+    parsed_incrementally = mdto.from_file(xmlfile)
+
+    assert parsed_incrementally == parsed == mdto_object
+
+
+def test_iterparse_object_drops_parsed_children(informatieobject, tmp_path):
+    """Test that the children of the object element are removed once parsed"""
+    xmlfile = str(tmp_path / "informatieobject.xml")
+    informatieobject.write_xml(xmlfile)
+
+    object_elem, children = mdto.mdto._iterparse_object(xmlfile)
+    n_children = 0
+    for child in children:
+        n_children += 1
+        # children that come before the one being parsed have been removed
+        assert child.getprevious() is None
+
+    assert n_children > 1
+    assert len(object_elem) == 1
+
+
+def test_from_files(informatieobject, bestand, tmp_path):
+    """Test that from_files() returns the same objects as from_file(), in order"""
+    xmlfiles = []
+    for i, mdto_object in enumerate([informatieobject, bestand, informatieobject]):
+        xmlfile = str(tmp_path / f"object-{i}.xml")
+        mdto_object.write_xml(xmlfile)
+        xmlfiles.append(xmlfile)
+
+    assert mdto.from_files(xmlfiles, max_workers=2) == [
+        mdto.from_file(xmlfile) for xmlfile in xmlfiles
+    ]